@@ -278,6 +278,7 @@ def run_cmd(
         orderbook,
     )
     store = context.open_store(settings)
+    store.buffer_audit_logs()
     runner = Runner(
         settings,
         store,
@@ -215,9 +215,7 @@ async def risk_state_api() -> dict:
     store = context.open_store(settings)
     try:
         day = datetime.now(timezone.utc).date().isoformat()
-        daily_orders = store.get_daily_execution_count(day)
-        daily_pnl = store.get_daily_pnl(day)
-        last_exec = store.get_last_execution_time()
+        daily_pnl, daily_orders, last_exec = store.get_risk_counters(day)
         reset_at = datetime.now(timezone.utc).date() + timedelta(days=1)
         reset_at_utc = datetime.combine(reset_at, datetime.min.time(), tzinfo=timezone.utc).isoformat()
         return {
@@ -500,6 +498,7 @@ def _start_runner_thread(settings, strategy: str, mode: str) -> None:
     def _run() -> None:
         global _RUNNER_INSTANCE
         store = context.open_store(settings)
+        store.buffer_audit_logs()
         runner = Runner(
             settings,
             store,
@@ -546,6 +545,18 @@ async def auto_start_runner() -> None:
     _log_runner_start(settings, strategy, mode, source="autostart")
 
 
+@app.on_event("shutdown")
+async def stop_runner_on_shutdown() -> None:
+    # The runner's store lives on its own thread; let that thread flush buffered audit
+    # logs and close the connection instead of leaving it to interpreter exit.
+    with _RUNNER_LOCK:
+        if _RUNNER_INSTANCE:
+            _RUNNER_INSTANCE.request_stop()
+        thread = _RUNNER_THREAD
+    if thread and thread.is_alive():
+        thread.join(timeout=2)
+
+
 @app.post("/api/runner/start")
 async def runner_start_api(payload: RunnerStartRequest) -> dict:
     global _RUNNER_THREAD, _RUNNER_INSTANCE
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
+import heapq
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Sequence
 
 from trade_agent.config import AppSettings
 from trade_agent.metrics import Metrics, compute_metrics, save_report
-from trade_agent.news.features import aggregate_feature_vector
 from trade_agent.risk import RiskState, evaluate_plan
 from trade_agent.schemas import FeatureRow
 from trade_agent.store import SQLiteStore
@@ -34,6 +34,16 @@ def _ms_to_iso(ts_ms: int) -> str:
     return datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc).isoformat()
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_US = timedelta(microseconds=1)
+
+
+def _to_us(dt: datetime) -> int:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // _ONE_US
+
+
 def _collect_news_features(
     store: SQLiteStore, start_iso: str, end_iso: str, latency_seconds: int
 ) -> list[dict]:
@@ -55,18 +65,68 @@ def _collect_news_features(
                 "published_at": row["published_at"],
                 "observed_at": row["observed_at"],
                 "available_at": available_at.isoformat(),
+                # Parsed once here so the bar loop only compares integers.
+                "published_us": _to_us(published),
+                "available_us": _to_us(available_at),
             }
         )
-    return sorted(enriched, key=lambda row: row["available_at"])
+    return sorted(enriched, key=lambda row: row["available_us"])
+
+
+class _NewsWindow:
+    # Running sums over the news inside the lookback window, matching
+    # aggregate_feature_vector without re-scanning every available article per bar.
+    # Articles enter in available_us order and leave in published_us order; since
+    # available_at >= published_at, anything available is never published in the future.
+
+    def __init__(self) -> None:
+        self._expiry: list[tuple[int, int]] = []
+        self._items: dict[int, dict] = {}
+        self._seq = 0
+        self.count = 0
+        self.positive = 0
+        self.negative = 0
+        self.weighted = 0.0
+        self.abs_weight = 0.0
 
+    def _apply(self, feature: dict, sign: int) -> None:
+        sentiment = feature["sentiment"]
+        weight = feature["source_weight"]
+        self.count += sign
+        self.weighted += sign * sentiment * weight
+        self.abs_weight += sign * abs(weight)
+        if sentiment > 0.05:
+            self.positive += sign
+        elif sentiment < -0.05:
+            self.negative += sign
+        if self.count == 0:
+            self.weighted = 0.0
+            self.abs_weight = 0.0
 
-def _filter_recent_news(features: Sequence[dict], cutoff: datetime, lookback_hours: int) -> list[dict]:
-    start = cutoff - timedelta(hours=lookback_hours)
-    return [
-        f
-        for f in features
-        if start <= datetime.fromisoformat(f["published_at"]) <= cutoff
-    ]
+    def add(self, feature: dict) -> None:
+        self._seq += 1
+        self._items[self._seq] = feature
+        heapq.heappush(self._expiry, (feature["published_us"], self._seq))
+        self._apply(feature, 1)
+
+    def expire_before(self, start_us: int) -> None:
+        while self._expiry and self._expiry[0][0] < start_us:
+            _, seq = heapq.heappop(self._expiry)
+            self._apply(self._items.pop(seq), -1)
+
+    def sentiment(self) -> float:
+        if not self.count:
+            return 0.0
+        return self.weighted / max(self.abs_weight, 1.0)
+
+    def feature_vector(self) -> dict[str, float]:
+        return {
+            "sentiment_weighted": self.sentiment(),
+            "news_count": float(self.count),
+            "positive_count": float(self.positive),
+            "negative_count": float(self.negative),
+            "avg_source_weight": self.abs_weight / self.count if self.count else 0.0,
+        }
 
 
 def run_backtest(
@@ -81,6 +141,9 @@ def run_backtest(
 ) -> BacktestResult:
     start_ms = _iso_to_ms(f"{start}T00:00:00+00:00")
     end_ms = _iso_to_ms(f"{end}T23:59:59+00:00")
+    # Materialized up front: the loop writes feature rows on this connection, and an open
+    # read cursor would pin a WAL snapshot that fails those writes with SQLITE_BUSY_SNAPSHOT
+    # as soon as another connection commits.
     candles = store.list_candles_between(symbol, timeframe, start_ms, end_ms)
     if not candles:
         raise ValueError("no candles in range")
@@ -92,7 +155,15 @@ def run_backtest(
         settings.news.news_latency_seconds,
     )
     news_idx = 0
-    available_news: list[dict] = []
+    news_count = len(news_features_all)
+    news_window = _NewsWindow()
+    lookback_us = settings.news.sentiment_lookback_hours * 3600 * 1_000_000
+
+    baseline_cfg = settings.strategies.baseline
+    # Strategies only look back max(sma_period, momentum_lookback) + 1 candles.
+    candle_window: deque = deque(
+        maxlen=max(baseline_cfg.sma_period, baseline_cfg.momentum_lookback) + 1
+    )
 
     position = 0.0
     avg_cost = 0.0
@@ -100,22 +171,20 @@ def run_backtest(
     current_day: str | None = None
     state = RiskState(daily_pnl=0.0, daily_orders=0, last_exec_time=None)
 
-    for idx in range(len(candles)):
-        candle = candles[idx]
+    for candle in candles:
+        candle_window.append(candle)
         ts = int(candle["ts"])
         current_time = datetime.fromtimestamp(ts / 1000, tz=timezone.utc)
-        while news_idx < len(news_features_all):
-            available_at = datetime.fromisoformat(news_features_all[news_idx]["available_at"])
-            if available_at <= current_time:
-                available_news.append(news_features_all[news_idx])
-                news_idx += 1
-            else:
-                break
-
-        lookback_news = _filter_recent_news(
-            available_news, current_time, settings.news.sentiment_lookback_hours
-        )
-        feature_vector = aggregate_feature_vector(lookback_news)
+        current_us = ts * 1000
+        while (
+            news_idx < news_count
+            and news_features_all[news_idx]["available_us"] <= current_us
+        ):
+            news_window.add(news_features_all[news_idx])
+            news_idx += 1
+        news_window.expire_before(current_us - lookback_us)
+
+        feature_vector = news_window.feature_vector()
         store.save_feature_row(
             FeatureRow(
                 symbol=symbol,
@@ -130,18 +199,15 @@ def run_backtest(
             )
         )
 
-        candle_slice = candles[: idx + 1]
         if strategy_name == "baseline":
-            plan = baseline.generate_plan(
-                symbol, candle_slice, settings.risk, settings.strategies.baseline
-            )
+            plan = baseline.generate_plan(symbol, candle_window, settings.risk, baseline_cfg)
         else:
-            plan = news_overlay.generate_plan(
+            plan = news_overlay.generate_plan_from_sentiment(
                 symbol,
-                candle_slice,
-                lookback_news,
+                candle_window,
+                feature_vector["sentiment_weighted"],
                 settings.risk,
-                settings.strategies.baseline,
+                baseline_cfg,
                 settings.strategies.news_overlay,
             )
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import copy
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -28,7 +29,7 @@ class ConfigValidationException(Exception):
         super().__init__(message)
 
 
-@dataclass
+@dataclass(slots=True)
 class AppConfig:
     name: str
     timezone: str
@@ -37,7 +38,7 @@ class AppConfig:
     log_level: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ExchangeConfig:
     name: str
     api_key_env: str
@@ -47,7 +48,7 @@ class ExchangeConfig:
     options: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class TradingConfig:
     mode: str
     dry_run: bool
@@ -66,13 +67,14 @@ class TradingConfig:
     maker_emulation: "MakerEmulationConfig"
 
 
-@dataclass
+@dataclass(slots=True)
 class MakerEmulationConfig:
     buffer_bps: float
     use_tick: bool
+    orderbook_ttl_ms: int = 200
 
 
-@dataclass
+@dataclass(slots=True)
 class RiskConfig:
     capital_jpy: float
     max_position_pct: float
@@ -84,7 +86,7 @@ class RiskConfig:
     cooldown_bypass_pct: float
 
 
-@dataclass
+@dataclass(slots=True)
 class NewsConfig:
     rss_urls: list[str]
     keyword_flags: list[str]
@@ -93,14 +95,14 @@ class NewsConfig:
     news_latency_seconds: int
 
 
-@dataclass
+@dataclass(slots=True)
 class StrategyBaselineConfig:
     sma_period: int
     momentum_lookback: int
     base_position_pct: float
 
 
-@dataclass
+@dataclass(slots=True)
 class StrategyNewsOverlayConfig:
     sentiment_boost_threshold: float
     sentiment_cut_threshold: float
@@ -108,13 +110,13 @@ class StrategyNewsOverlayConfig:
     cut_multiplier: float
 
 
-@dataclass
+@dataclass(slots=True)
 class StrategiesConfig:
     baseline: StrategyBaselineConfig
     news_overlay: StrategyNewsOverlayConfig
 
 
-@dataclass
+@dataclass(slots=True)
 class PaperConfig:
     seed: int
     slippage_bps: float
@@ -123,7 +125,7 @@ class PaperConfig:
     spread_bps: float
 
 
-@dataclass
+@dataclass(slots=True)
 class BacktestConfig:
     maker_fee_bps: float
     taker_fee_bps: float
@@ -131,7 +133,7 @@ class BacktestConfig:
     assume_taker: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class AutopilotConfig:
     enabled: bool
     max_order_notional_jpy: float
@@ -140,7 +142,7 @@ class AutopilotConfig:
     symbol_whitelist: list[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class RunnerConfig:
     enabled: bool
     market_poll_seconds: int
@@ -150,9 +152,10 @@ class RunnerConfig:
     orderbook: bool
     jitter_seconds: int
     max_backoff_seconds: int
+    maintenance_seconds: int
 
 
-@dataclass
+@dataclass(slots=True)
 class AppSettings:
     app: AppConfig
     exchange: ExchangeConfig
@@ -197,7 +200,7 @@ DEFAULTS: dict[str, Any] = {
         "order_timeout_seconds": 30,
         "post_only": True,
         "intent_expiry_seconds": 900,
-        "maker_emulation": {"buffer_bps": 0.1, "use_tick": True},
+        "maker_emulation": {"buffer_bps": 0.1, "use_tick": True, "orderbook_ttl_ms": 200},
     },
     "risk": {
         "capital_jpy": 500000,
@@ -259,17 +262,21 @@ DEFAULTS: dict[str, Any] = {
         "orderbook": False,
         "jitter_seconds": 2,
         "max_backoff_seconds": 300,
+        "maintenance_seconds": 900,
     },
 }
 
 
 def _merge_dicts(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
-    merged = dict(base)
-    for key, value in override.items():
-        if isinstance(value, dict) and isinstance(base.get(key), dict):
-            merged[key] = _merge_dicts(base[key], value)
-        else:
-            merged[key] = value
+    merged = copy.deepcopy(base)
+    stack = [(merged, override)]
+    while stack:
+        dst, src = stack.pop()
+        for key, value in src.items():
+            if isinstance(value, dict) and isinstance(dst.get(key), dict):
+                stack.append((dst[key], value))
+            else:
+                dst[key] = value
     return merged
 
 
@@ -445,6 +452,15 @@ def load_config(path: str) -> AppSettings:
                     default=DEFAULTS["trading"]["maker_emulation"]["use_tick"],
                 )
             ),
+            orderbook_ttl_ms=int(
+                _get(
+                    merged,
+                    "trading",
+                    "maker_emulation",
+                    "orderbook_ttl_ms",
+                    default=DEFAULTS["trading"]["maker_emulation"]["orderbook_ttl_ms"],
+                )
+            ),
         ),
     )
 
@@ -757,6 +773,14 @@ def load_config(path: str) -> AppSettings:
                 default=DEFAULTS["runner"]["max_backoff_seconds"],
             )
         ),
+        maintenance_seconds=int(
+            _get(
+                merged,
+                "runner",
+                "maintenance_seconds",
+                default=DEFAULTS["runner"]["maintenance_seconds"],
+            )
+        ),
     )
 
     return AppSettings(
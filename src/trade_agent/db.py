@@ -1,32 +1,108 @@
 from __future__ import annotations
 
-import json
+import functools
+import itertools
+import operator
 import sqlite3
-from datetime import datetime, timezone
-from typing import Any, Iterable
-
-from trade_agent.schemas import FeatureRow, ReportRecord
-
-
-def connect(db_path: str) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
+import time
+from array import array
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Iterator
+
+from trade_agent.schemas import FeatureRow, ReportRecord, compact_json
+
+
+# The helpers below issue around a hundred distinct statements, plus one multi-row
+# candle insert per chunk size; the driver's default cache of 128 can evict hot ones.
+_CACHED_STATEMENTS = 256
+
+
+def connect(
+    db_path: str,
+    check_same_thread: bool = True,
+    pragmas: dict[str, Any] | None = None,
+) -> sqlite3.Connection:
+    # Autocommit mode: statements outside transaction() commit immediately, and
+    # transaction() groups bursts of writes into a single commit.
+    conn = sqlite3.connect(
+        db_path,
+        check_same_thread=check_same_thread,
+        isolation_level=None,
+        cached_statements=_CACHED_STATEMENTS,
+    )
     conn.row_factory = sqlite3.Row
+    # page_size only takes effect before the first table is written; 8 KiB pages
+    # keep the candle/fill B-trees shallower for the sequential backtest scans.
+    if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+        conn.execute("PRAGMA page_size=8192")
     conn.execute("PRAGMA journal_mode=WAL")
+    # NORMAL is durable across application crashes in WAL mode and avoids an fsync per commit.
+    conn.execute("PRAGMA synchronous=NORMAL")
     conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    conn.execute("PRAGMA wal_autocheckpoint=1000")
+    # Caller overrides, e.g. {"synchronous": "FULL"} for a deployment that wants an
+    # fsync per commit or a smaller cache_size on constrained hosts.
+    for name, value in (pragmas or {}).items():
+        conn.execute(f"PRAGMA {name}={value}")
     return conn
 
 
-def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
-    cur = conn.execute(f"PRAGMA table_info({table})")
-    return any(row["name"] == column for row in cur.fetchall())
+def run_maintenance(conn: sqlite3.Connection) -> None:
+    # Refresh planner statistics for tables whose shape changed, then fold the WAL back
+    # into the database so the -wal file does not keep growing under a long-lived writer.
+    conn.execute("PRAGMA optimize")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    if conn.in_transaction:
+        # Nested use joins the outer transaction; the outermost block commits.
+        yield conn
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def _schema_columns(conn: sqlite3.Connection) -> dict[str, set[str]]:
+    # One query for every table's columns instead of a PRAGMA table_info per check.
+    schema: dict[str, set[str]] = {}
+    for table, column in conn.execute(
+        """
+        SELECT m.name, p.name FROM sqlite_master m, pragma_table_info(m.name) p
+        WHERE m.type = 'table'
+        """
+    ):
+        schema.setdefault(table, set()).add(column)
+    return schema
+
+
+def _column_exists(schema: dict[str, set[str]], table: str, column: str) -> bool:
+    return column in schema.get(table, ())
 
 
 def _ensure_column(
-    conn: sqlite3.Connection, table: str, column: str, definition: str, default: Any | None = None
+    conn: sqlite3.Connection,
+    schema: dict[str, set[str]],
+    table: str,
+    column: str,
+    definition: str,
+    default: Any | None = None,
 ) -> None:
-    if _column_exists(conn, table, column):
+    if _column_exists(schema, table, column):
         return
     conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    schema.setdefault(table, set()).add(column)
     if default is not None:
         conn.execute(
             f"UPDATE {table} SET {column} = ? WHERE {column} IS NULL OR {column} = ''",
@@ -36,6 +112,7 @@ def _ensure_column(
 
 def _ensure_index(
     conn: sqlite3.Connection,
+    schema: dict[str, set[str]],
     name: str,
     table: str,
     columns: str,
@@ -44,7 +121,7 @@ def _ensure_index(
 ) -> None:
     if required_columns:
         for col in required_columns:
-            if not _column_exists(conn, table, col):
+            if not _column_exists(schema, table, col):
                 return
     kind = "UNIQUE INDEX" if unique else "INDEX"
     conn.execute(f"CREATE {kind} IF NOT EXISTS {name} ON {table}({columns})")
@@ -59,7 +136,51 @@ def _iso_day(ts: str) -> str:
         return datetime.now(timezone.utc).date().isoformat()
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MS = timedelta(milliseconds=1)
+
+
+def _iso_to_ms(ts: str) -> int | None:
+    try:
+        dt = datetime.fromisoformat(ts)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    # Floor division keeps 23:59:59.999999 inside its own day.
+    return (dt - _EPOCH) // _ONE_MS
+
+
+def _day_bounds_ms(day: str) -> tuple[int, int]:
+    # Half-open [day, next day) range in UTC epoch ms for an index range scan.
+    start = datetime.fromisoformat(day).replace(tzinfo=timezone.utc)
+    return (start - _EPOCH) // _ONE_MS, (start + timedelta(days=1) - _EPOCH) // _ONE_MS
+
+
+def _backfill_epoch_ms(conn: sqlite3.Connection, table: str, source: str, target: str) -> None:
+    rows = conn.execute(
+        f"SELECT rowid, {source} FROM {table} WHERE {target} IS NULL"
+    ).fetchall()
+    conn.executemany(
+        f"UPDATE {table} SET {target} = ? WHERE rowid = ?",
+        ((_iso_to_ms(str(row[1])), row[0]) for row in rows),
+    )
+
+
 def init_db(conn: sqlite3.Connection) -> None:
+    init_schema(conn)
+    ensure_indexes(conn)
+    with transaction(conn):
+        missing = conn.execute(
+            "SELECT DISTINCT symbol FROM fills WHERE symbol NOT IN (SELECT symbol FROM positions)"
+        ).fetchall()
+        for row in missing:
+            _rebuild_position(conn, row["symbol"])
+
+
+def init_schema(conn: sqlite3.Connection) -> None:
+    # Tables, column migrations and the unique indexes that dedupe inserts. Bulk loaders
+    # can call this, load, and then build the secondary indexes once via ensure_indexes.
     conn.executescript(
         """
         CREATE TABLE IF NOT EXISTS candles (
@@ -74,7 +195,7 @@ def init_db(conn: sqlite3.Connection) -> None:
             source TEXT NOT NULL,
             ingested_at TEXT NOT NULL,
             PRIMARY KEY (symbol, timeframe, ts)
-        );
+        ) STRICT;
 
         CREATE TABLE IF NOT EXISTS orderbook_snapshots (
             symbol TEXT NOT NULL,
@@ -84,7 +205,7 @@ def init_db(conn: sqlite3.Connection) -> None:
             bid_size REAL NOT NULL,
             ask_size REAL NOT NULL,
             ingested_at TEXT NOT NULL
-        );
+        ) STRICT;
 
         CREATE TABLE IF NOT EXISTS news_articles (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -142,7 +263,7 @@ def init_db(conn: sqlite3.Connection) -> None:
             approval_phrase_hash TEXT NOT NULL,
             approval_phrase TEXT NOT NULL,
             FOREIGN KEY (intent_id) REFERENCES order_intents(intent_id)
-        );
+        ) WITHOUT ROWID;
 
         CREATE TABLE IF NOT EXISTS executions (
             exec_id TEXT PRIMARY KEY,
@@ -170,6 +291,16 @@ def init_db(conn: sqlite3.Connection) -> None:
             FOREIGN KEY (exec_id) REFERENCES executions(exec_id)
         );
 
+        CREATE TABLE IF NOT EXISTS positions (
+            symbol TEXT PRIMARY KEY,
+            size REAL NOT NULL,
+            cost_total REAL NOT NULL,
+            net_size REAL NOT NULL,
+            last_ts TEXT NOT NULL,
+            open_size REAL NOT NULL DEFAULT 0,
+            open_ts TEXT
+        );
+
         CREATE TABLE IF NOT EXISTS orders (
             order_id TEXT PRIMARY KEY,
             exec_id TEXT NOT NULL,
@@ -268,62 +399,289 @@ def init_db(conn: sqlite3.Connection) -> None:
         """
     )
 
-    _ensure_column(conn, "candles", "source", "TEXT NOT NULL DEFAULT 'exchange'", "exchange")
-    _ensure_column(conn, "news_articles", "guid", "TEXT")
-    _ensure_column(conn, "news_articles", "summary", "TEXT")
-    _ensure_column(conn, "news_articles", "observed_at", "TEXT NOT NULL DEFAULT ''", utc_now_iso())
-    _ensure_column(conn, "news_articles", "raw_payload_hash", "TEXT")
-    conn.execute(
-        """
-        UPDATE news_articles
-        SET observed_at = ingested_at
-        WHERE observed_at IS NULL OR observed_at = ''
-        """
-    )
-    _ensure_column(
-        conn, "news_features", "feature_version", "TEXT NOT NULL DEFAULT 'news_v1'", "news_v1"
-    )
-    _ensure_column(conn, "order_intents", "order_type", "TEXT NOT NULL DEFAULT 'limit'", "limit")
-    _ensure_column(conn, "order_intents", "time_in_force", "TEXT NOT NULL DEFAULT 'GTC'", "GTC")
-    _ensure_column(conn, "order_intents", "rationale_features_ref", "TEXT")
-    _ensure_column(conn, "approvals", "approved_by", "TEXT NOT NULL DEFAULT 'local'", "local")
-    _ensure_column(conn, "approvals", "approval_phrase_hash", "TEXT NOT NULL DEFAULT ''", "")
-    _ensure_column(conn, "executions", "fee", "REAL NOT NULL DEFAULT 0", 0.0)
-    _ensure_column(conn, "executions", "slippage_model", "TEXT NOT NULL DEFAULT ''", "")
-
-    _ensure_index(conn, "idx_candles_symbol_timeframe_ts", "candles", "symbol, timeframe, ts")
-    _ensure_index(conn, "idx_news_published_at", "news_articles", "published_at")
-    _ensure_index(
-        conn,
-        "idx_news_observed_at",
-        "news_articles",
-        "observed_at",
-        required_columns=["observed_at"],
-    )
-    _ensure_index(
-        conn,
-        "idx_news_features_article_version",
-        "news_features",
-        "article_id, feature_version",
-        unique=True,
-        required_columns=["feature_version"],
-    )
-    _ensure_index(conn, "idx_feature_rows_symbol_ts", "feature_rows", "symbol, ts")
-    _ensure_index(conn, "idx_executions_intent_id", "executions", "intent_id")
-    _ensure_index(conn, "idx_fills_symbol", "fills", "symbol")
-    _ensure_index(conn, "idx_orders_intent_id", "orders", "intent_id")
-    _ensure_index(conn, "idx_daily_stats_day", "daily_stats", "day", unique=True)
-    _ensure_index(conn, "idx_alerts_symbol", "alerts", "symbol")
-    _ensure_index(conn, "idx_external_trades_symbol_ts", "external_trades", "symbol, ts")
-    _ensure_index(conn, "idx_external_trades_ts", "external_trades", "ts")
-    _ensure_index(conn, "idx_external_balances_exchange_ts", "external_balances", "exchange, ts")
-    conn.commit()
+    schema = _schema_columns(conn)
+    with transaction(conn):
+        _ensure_column(
+            conn, schema, "candles", "source", "TEXT NOT NULL DEFAULT 'exchange'", "exchange"
+        )
+        _ensure_column(conn, schema, "news_articles", "guid", "TEXT")
+        _ensure_column(conn, schema, "news_articles", "summary", "TEXT")
+        _ensure_column(
+            conn, schema, "news_articles", "observed_at", "TEXT NOT NULL DEFAULT ''", utc_now_iso()
+        )
+        _ensure_column(conn, schema, "news_articles", "raw_payload_hash", "TEXT")
+        conn.execute(
+            """
+            UPDATE news_articles
+            SET observed_at = ingested_at
+            WHERE observed_at IS NULL OR observed_at = ''
+            """
+        )
+        _ensure_column(
+            conn,
+            schema,
+            "news_features",
+            "feature_version",
+            "TEXT NOT NULL DEFAULT 'news_v1'",
+            "news_v1",
+        )
+        # featured = 1 once the article has news_v1 features (maintained by trigger), so
+        # the extraction backlog is read from a small partial index instead of a join.
+        if not _column_exists(schema, "news_articles", "featured"):
+            _ensure_column(conn, schema, "news_articles", "featured", "INTEGER NOT NULL DEFAULT 0")
+            conn.execute(
+                """
+                UPDATE news_articles SET featured = 1
+                WHERE id IN (
+                    SELECT article_id FROM news_features WHERE feature_version = 'news_v1'
+                )
+                """
+            )
+        conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_news_features_featured
+            AFTER INSERT ON news_features
+            WHEN NEW.feature_version = 'news_v1'
+            BEGIN
+                UPDATE news_articles SET featured = 1 WHERE id = NEW.article_id AND featured = 0;
+            END
+            """
+        )
+        _ensure_column(
+            conn, schema, "order_intents", "order_type", "TEXT NOT NULL DEFAULT 'limit'", "limit"
+        )
+        _ensure_column(
+            conn, schema, "order_intents", "time_in_force", "TEXT NOT NULL DEFAULT 'GTC'", "GTC"
+        )
+        _ensure_column(conn, schema, "order_intents", "rationale_features_ref", "TEXT")
+        _ensure_column(
+            conn, schema, "approvals", "approved_by", "TEXT NOT NULL DEFAULT 'local'", "local"
+        )
+        _ensure_column(
+            conn, schema, "approvals", "approval_phrase_hash", "TEXT NOT NULL DEFAULT ''", ""
+        )
+        # Approvals are small rows only ever looked up by intent_id: clustering them on
+        # the primary key drops the hidden rowid and the separate autoindex.
+        approvals_sql = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'approvals'"
+        ).fetchone()[0]
+        if "WITHOUT ROWID" not in approvals_sql.upper():
+            conn.execute(
+                """
+                CREATE TABLE approvals_new (
+                    intent_id TEXT PRIMARY KEY,
+                    intent_hash TEXT NOT NULL,
+                    approved_at TEXT NOT NULL,
+                    approved_by TEXT NOT NULL,
+                    approval_phrase_hash TEXT NOT NULL,
+                    approval_phrase TEXT NOT NULL,
+                    FOREIGN KEY (intent_id) REFERENCES order_intents(intent_id)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                """
+                INSERT INTO approvals_new
+                (intent_id, intent_hash, approved_at, approved_by, approval_phrase_hash,
+                 approval_phrase)
+                SELECT intent_id, intent_hash, approved_at, approved_by, approval_phrase_hash,
+                       approval_phrase
+                FROM approvals
+                """
+            )
+            conn.execute("DROP TABLE approvals")
+            conn.execute("ALTER TABLE approvals_new RENAME TO approvals")
+        _ensure_column(conn, schema, "executions", "fee", "REAL NOT NULL DEFAULT 0", 0.0)
+        _ensure_column(conn, schema, "executions", "slippage_model", "TEXT NOT NULL DEFAULT ''", "")
+        # Integer epoch-ms copies of the timestamps the daily risk counters range over.
+        _ensure_column(conn, schema, "executions", "executed_at_ms", "INTEGER")
+        _backfill_epoch_ms(conn, "executions", "executed_at", "executed_at_ms")
+        _ensure_column(conn, schema, "trade_results", "created_at_ms", "INTEGER")
+        _backfill_epoch_ms(conn, "trade_results", "created_at", "created_at_ms")
+        # open_size/open_ts track the current long leg for get_position_open_time;
+        # emptying positions makes init_db rebuild every symbol from fills.
+        if not _column_exists(schema, "positions", "open_ts"):
+            _ensure_column(conn, schema, "positions", "open_size", "REAL NOT NULL DEFAULT 0")
+            _ensure_column(conn, schema, "positions", "open_ts", "TEXT")
+            conn.execute("DELETE FROM positions")
+        # Latest balance per (exchange, currency), kept current by trigger so
+        # list_latest_external_balances never scans the growing history.
+        if "external_balances_latest" not in schema:
+            conn.execute(
+                """
+                CREATE TABLE external_balances_latest (
+                    exchange TEXT NOT NULL,
+                    currency TEXT NOT NULL,
+                    total REAL NOT NULL,
+                    free REAL NOT NULL,
+                    used REAL NOT NULL,
+                    ts TEXT NOT NULL,
+                    PRIMARY KEY (exchange, currency)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                """
+                INSERT INTO external_balances_latest
+                SELECT exchange, currency, total, free, used, ts
+                FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY exchange, currency ORDER BY ts DESC, id DESC
+                    ) AS rn
+                    FROM external_balances
+                )
+                WHERE rn = 1
+                """
+            )
+        # ">=" so a later sync stamped with the same ts still wins, as with id DESC above.
+        conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_external_balances_latest
+            AFTER INSERT ON external_balances
+            BEGIN
+                INSERT INTO external_balances_latest (exchange, currency, total, free, used, ts)
+                VALUES (NEW.exchange, NEW.currency, NEW.total, NEW.free, NEW.used, NEW.ts)
+                ON CONFLICT (exchange, currency) DO UPDATE SET
+                    total = excluded.total,
+                    free = excluded.free,
+                    used = excluded.used,
+                    ts = excluded.ts
+                WHERE excluded.ts >= external_balances_latest.ts;
+            END
+            """
+        )
+
+        _ensure_index(
+            conn,
+            schema,
+            "idx_news_features_article_version",
+            "news_features",
+            "article_id, feature_version",
+            unique=True,
+            required_columns=["feature_version"],
+        )
+        _ensure_index(conn, schema, "idx_daily_stats_day", "daily_stats", "day", unique=True)
+
+
+def ensure_indexes(conn: sqlite3.Connection) -> None:
+    schema = _schema_columns(conn)
+    with transaction(conn):
+        # The (symbol, timeframe, ts) primary key already serves MAX(ts) and ORDER BY ts
+        # DESC LIMIT n lookups; a second identical index only doubled candle write cost.
+        conn.execute("DROP INDEX IF EXISTS idx_candles_symbol_timeframe_ts")
+        _ensure_index(conn, schema, "idx_news_published_at", "news_articles", "published_at")
+        _ensure_index(
+            conn,
+            schema,
+            "idx_news_observed_at",
+            "news_articles",
+            "observed_at",
+            required_columns=["observed_at"],
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_news_articles_unfeatured
+            ON news_articles(published_at) WHERE featured = 0
+            """
+        )
+        # Equality columns first so version-filtered range scans stay ordered by ts.
+        conn.execute("DROP INDEX IF EXISTS idx_feature_rows_symbol_ts")
+        _ensure_index(
+            conn,
+            schema,
+            "idx_feature_rows_symbol_version_ts",
+            "feature_rows",
+            "symbol, feature_version, ts",
+        )
+        _ensure_index(conn, schema, "idx_executions_intent_id", "executions", "intent_id")
+        _ensure_index(conn, schema, "idx_executions_executed_at", "executions", "executed_at")
+        _ensure_index(conn, schema, "idx_executions_executed_at_ms", "executions", "executed_at_ms")
+        # Covering index: get_daily_pnl sums pnl_jpy without touching the table rows.
+        conn.execute("DROP INDEX IF EXISTS idx_trade_results_created_at")
+        conn.execute("DROP INDEX IF EXISTS idx_trade_results_created_at_ms")
+        _ensure_index(
+            conn,
+            schema,
+            "idx_trade_results_created_at_ms_pnl",
+            "trade_results",
+            "created_at_ms, pnl_jpy",
+        )
+        # (symbol, ts) serves both symbol lookups and the ordered per-symbol replays.
+        conn.execute("DROP INDEX IF EXISTS idx_fills_symbol")
+        _ensure_index(conn, schema, "idx_fills_symbol_ts", "fills", "symbol, ts")
+        _ensure_index(conn, schema, "idx_orderbook_symbol_ts", "orderbook_snapshots", "symbol, ts")
+        _ensure_index(conn, schema, "idx_audit_logs_event_ts", "audit_logs", "event, ts")
+        _ensure_index(conn, schema, "idx_audit_logs_ts", "audit_logs", "ts")
+        _ensure_index(conn, schema, "idx_orders_intent_id", "orders", "intent_id")
+        _ensure_index(
+            conn,
+            schema,
+            "idx_order_intents_status_created_at",
+            "order_intents",
+            "status, created_at",
+        )
+        _ensure_index(conn, schema, "idx_alerts_symbol", "alerts", "symbol")
+        # check_alerts reads only enabled alerts, newest first; triggered ones drop out.
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_alerts_enabled_created_at
+            ON alerts(created_at) WHERE enabled = 1
+            """
+        )
+        # Every external_trades query filters on exchange before symbol/ts.
+        conn.execute("DROP INDEX IF EXISTS idx_external_trades_symbol_ts")
+        conn.execute("DROP INDEX IF EXISTS idx_external_trades_ts")
+        _ensure_index(
+            conn,
+            schema,
+            "idx_external_trades_exchange_symbol_ts",
+            "external_trades",
+            "exchange, symbol, ts",
+        )
+        _ensure_index(
+            conn, schema, "idx_external_trades_exchange_ts", "external_trades", "exchange, ts"
+        )
+        # Balance history is append-only; latest values are read from external_balances_latest.
+        conn.execute("DROP INDEX IF EXISTS idx_external_balances_exchange_ts")
+        conn.execute("DROP INDEX IF EXISTS idx_external_balances_exchange_currency_ts")
 
 
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+_INSERT_CANDLE_SQL = """
+    INSERT INTO candles
+    (symbol, timeframe, ts, open, high, low, close, volume, source, ingested_at)
+    VALUES
+"""
+_CANDLE_PLACEHOLDERS = "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+# 500 rows x 10 columns stays well under SQLite's default 32766 bound-variable limit.
+_CANDLE_INSERT_CHUNK = 500
+
+
+@functools.lru_cache(maxsize=None)
+def _candle_insert_sql(rows: int) -> str:
+    return (
+        _INSERT_CANDLE_SQL
+        + ", ".join([_CANDLE_PLACEHOLDERS] * rows)
+        + " ON CONFLICT (symbol, timeframe, ts) DO NOTHING"
+    )
+
+
+def _candle_chunks(rows: Iterator[list[Any]]) -> Iterator[list[list[Any]]]:
+    # Full chunks, then the remainder split into power-of-two pieces: the handful of
+    # distinct statement shapes stays resident in the connection's statement cache
+    # instead of every tail length compiling (and evicting) a fresh one.
+    while chunk := list(itertools.islice(rows, _CANDLE_INSERT_CHUNK)):
+        while chunk:
+            size = len(chunk)
+            if size < _CANDLE_INSERT_CHUNK:
+                size = 1 << (size.bit_length() - 1)
+            yield chunk[:size]
+            chunk = chunk[size:]
+
+
 def insert_candles(
     conn: sqlite3.Connection,
     symbol: str,
@@ -332,32 +690,28 @@ def insert_candles(
     source: str = "exchange",
 ) -> int:
     ingested_at = utc_now_iso()
-    before = conn.total_changes
-    rows = [
-        (
-            symbol,
-            timeframe,
-            int(c[0]),
-            float(c[1]),
-            float(c[2]),
-            float(c[3]),
-            float(c[4]),
-            float(c[5]),
-            source,
-            ingested_at,
-        )
-        for c in candles
-    ]
-    conn.executemany(
-        """
-        INSERT OR IGNORE INTO candles
-        (symbol, timeframe, ts, open, high, low, close, volume, source, ingested_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        rows,
-    )
-    conn.commit()
-    return conn.total_changes - before
+    rows = iter(candles)
+    inserted = 0
+    with transaction(conn):
+        # One multi-row VALUES statement per chunk: a single prepare/step instead of
+        # one VDBE run per candle as with executemany.
+        for chunk in _candle_chunks(rows):
+            params: list[Any] = []
+            for c in chunk:
+                params += (
+                    symbol,
+                    timeframe,
+                    int(c[0]),
+                    float(c[1]),
+                    float(c[2]),
+                    float(c[3]),
+                    float(c[4]),
+                    float(c[5]),
+                    source,
+                    ingested_at,
+                )
+            inserted += conn.execute(_candle_insert_sql(len(chunk)), params).rowcount
+    return inserted
 
 
 def fetch_candles(
@@ -368,7 +722,8 @@ def fetch_candles(
     since_ts: int | None = None,
 ) -> list[sqlite3.Row]:
     query = (
-        "SELECT * FROM candles WHERE symbol = ? AND timeframe = ? "
+        # Readers only need the OHLCV tuple; skip the source/ingested_at provenance columns.
+        "SELECT ts, open, high, low, close, volume FROM candles WHERE symbol = ? AND timeframe = ? "
         + ("AND ts >= ? " if since_ts is not None else "")
         + "ORDER BY ts ASC LIMIT ?"
     )
@@ -380,6 +735,45 @@ def fetch_candles(
     return cur.fetchall()
 
 
+def fetch_candles_columnar(
+    conn: sqlite3.Connection,
+    symbol: str,
+    timeframe: str,
+    limit: int,
+    since_ts: int | None = None,
+) -> dict[str, array]:
+    # Column-oriented variant of fetch_candles: one contiguous typed array per field
+    # (int64 ts, float64 prices/volume) instead of a Row object per candle.
+    query = (
+        "SELECT ts, open, high, low, close, volume FROM candles WHERE symbol = ? AND timeframe = ? "
+        + ("AND ts >= ? " if since_ts is not None else "")
+        + "ORDER BY ts ASC LIMIT ?"
+    )
+    params: list[Any] = [symbol, timeframe]
+    if since_ts is not None:
+        params.append(since_ts)
+    params.append(limit)
+    columns = {
+        "ts": array("q"),
+        "open": array("d"),
+        "high": array("d"),
+        "low": array("d"),
+        "close": array("d"),
+        "volume": array("d"),
+    }
+    ts, open_, high, low, close, volume = columns.values()
+    cur = conn.execute(query, params)
+    while rows := cur.fetchmany(1024):
+        for row in rows:
+            ts.append(row[0])
+            open_.append(row[1])
+            high.append(row[2])
+            low.append(row[3])
+            close.append(row[4])
+            volume.append(row[5])
+    return columns
+
+
 def insert_orderbook_snapshot(
     conn: sqlite3.Connection,
     symbol: str,
@@ -397,7 +791,27 @@ def insert_orderbook_snapshot(
         """,
         (symbol, ts, bid, ask, bid_size, ask_size, utc_now_iso()),
     )
-    conn.commit()
+
+
+def insert_orderbook_snapshots_many(
+    conn: sqlite3.Connection,
+    rows: Iterable[tuple[str, float, float, float, float, int]],
+    ingested_at: str | None = None,
+) -> None:
+    # rows: (symbol, bid, ask, bid_size, ask_size, ts)
+    ingested_at = ingested_at or utc_now_iso()
+    with transaction(conn):
+        conn.executemany(
+            """
+            INSERT INTO orderbook_snapshots
+            (symbol, ts, bid, ask, bid_size, ask_size, ingested_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (symbol, ts, bid, ask, bid_size, ask_size, ingested_at)
+                for symbol, bid, ask, bid_size, ask_size, ts in rows
+            ),
+        )
 
 
 def insert_news_article(
@@ -414,11 +828,14 @@ def insert_news_article(
 ) -> int | None:
     observed_at = observed_at or utc_now_iso()
     try:
+        # Duplicates (url or title_hash) resolve to no row instead of raising.
         cur = conn.execute(
             """
             INSERT INTO news_articles
             (url, title, source, guid, summary, published_at, observed_at, ingested_at, raw_payload_hash, title_hash)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT DO NOTHING
+            RETURNING id
             """,
             (
                 url,
@@ -433,10 +850,10 @@ def insert_news_article(
                 title_hash,
             ),
         )
-        conn.commit()
-        return int(cur.lastrowid)
+        rows = cur.fetchall()
     except sqlite3.IntegrityError:
         return None
+    return int(rows[0][0]) if rows else None
 
 
 def insert_news_features(
@@ -457,19 +874,49 @@ def insert_news_features(
         (
             article_id,
             sentiment,
-            json.dumps(keyword_flags, separators=(",", ":"), sort_keys=True),
+            compact_json(keyword_flags),
             source_weight,
             language,
             feature_version,
             utc_now_iso(),
         ),
     )
-    conn.commit()
+
+
+def insert_news_features_many(
+    conn: sqlite3.Connection,
+    rows: Iterable[tuple[int, float, dict[str, bool], float, str, str]],
+) -> int:
+    # rows: (article_id, sentiment, keyword_flags, source_weight, language, feature_version)
+    extracted_at = utc_now_iso()
+    with transaction(conn):
+        cur = conn.executemany(
+            """
+            INSERT OR IGNORE INTO news_features
+            (article_id, sentiment, keyword_flags, source_weight, language, feature_version,
+             extracted_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    article_id,
+                    sentiment,
+                    compact_json(keyword_flags),
+                    source_weight,
+                    language,
+                    feature_version,
+                    extracted_at,
+                )
+                for article_id, sentiment, keyword_flags, source_weight, language, feature_version
+                in rows
+            ),
+        )
+    # rowcount excludes the news_articles.featured updates made by the trigger.
+    return max(cur.rowcount, 0)
 
 
 def insert_feature_row(conn: sqlite3.Connection, row: FeatureRow) -> int:
-    before = conn.total_changes
-    conn.execute(
+    cur = conn.execute(
         """
         INSERT OR IGNORE INTO feature_rows
         (symbol, ts, feature_version, features_json, computed_at, news_window_start, news_window_end)
@@ -479,48 +926,47 @@ def insert_feature_row(conn: sqlite3.Connection, row: FeatureRow) -> int:
             row.symbol,
             row.ts,
             row.feature_version,
-            json.dumps(row.features, separators=(",", ":"), sort_keys=True),
+            compact_json(row.features),
             row.computed_at,
             row.news_window_start,
             row.news_window_end,
         ),
     )
-    conn.commit()
-    return conn.total_changes - before
+    return cur.rowcount
+
+
+_INTENT_COLUMNS = (
+    "intent_id",
+    "created_at",
+    "intent_json",
+    "intent_hash",
+    "status",
+    "expires_at",
+    "strategy",
+    "symbol",
+    "side",
+    "order_type",
+    "time_in_force",
+    "size",
+    "price",
+    "confidence",
+    "rationale",
+    "rationale_features_ref",
+    "mode",
+)
+_INTENT_DEFAULTS = {"order_type": "limit", "time_in_force": "GTC", "rationale_features_ref": None}
+_intent_values = operator.itemgetter(*_INTENT_COLUMNS)
+_INSERT_INTENT_SQL = (
+    f"INSERT OR IGNORE INTO order_intents ({', '.join(_INTENT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_INTENT_COLUMNS))})"
+)
 
 
 def insert_order_intent(conn: sqlite3.Connection, intent: dict[str, Any]) -> bool:
-    before = conn.total_changes
-    conn.execute(
-        """
-        INSERT OR IGNORE INTO order_intents
-        (intent_id, created_at, intent_json, intent_hash, status, expires_at, strategy,
-         symbol, side, order_type, time_in_force, size, price, confidence, rationale,
-         rationale_features_ref, mode)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            intent["intent_id"],
-            intent["created_at"],
-            intent["intent_json"],
-            intent["intent_hash"],
-            intent["status"],
-            intent["expires_at"],
-            intent["strategy"],
-            intent["symbol"],
-            intent["side"],
-            intent.get("order_type", "limit"),
-            intent.get("time_in_force", "GTC"),
-            intent["size"],
-            intent["price"],
-            intent["confidence"],
-            intent["rationale"],
-            intent.get("rationale_features_ref"),
-            intent["mode"],
-        ),
-    )
-    conn.commit()
-    return (conn.total_changes - before) > 0
+    if not _INTENT_DEFAULTS.keys() <= intent.keys():
+        intent = {**_INTENT_DEFAULTS, **intent}
+    # rowcount is 0 when OR IGNORE skipped a duplicate intent_id.
+    return conn.execute(_INSERT_INTENT_SQL, _intent_values(intent)).rowcount > 0
 
 
 def update_order_intent_status(conn: sqlite3.Connection, intent_id: str, status: str) -> None:
@@ -528,7 +974,6 @@ def update_order_intent_status(conn: sqlite3.Connection, intent_id: str, status:
         "UPDATE order_intents SET status = ? WHERE intent_id = ?",
         (status, intent_id),
     )
-    conn.commit()
 
 
 def get_order_intent(conn: sqlite3.Connection, intent_id: str) -> sqlite3.Row | None:
@@ -536,9 +981,30 @@ def get_order_intent(conn: sqlite3.Connection, intent_id: str) -> sqlite3.Row |
     return cur.fetchone()
 
 
+# Keeps IN (...) lists well under SQLite's bound-parameter limit.
+_IN_CHUNK = 500
+
+
+def get_order_intents(
+    conn: sqlite3.Connection, intent_ids: Iterable[str]
+) -> dict[str, sqlite3.Row]:
+    ids = iter(intent_ids)
+    rows: dict[str, sqlite3.Row] = {}
+    while chunk := list(itertools.islice(ids, _IN_CHUNK)):
+        cur = conn.execute(
+            "SELECT * FROM order_intents WHERE intent_id IN "
+            f"({', '.join('?' * len(chunk))})",
+            chunk,
+        )
+        rows.update((row["intent_id"], row) for row in cur)
+    return rows
+
+
 def get_latest_intent(conn: sqlite3.Connection, status: str = "proposed") -> sqlite3.Row | None:
     cur = conn.execute(
-        "SELECT * FROM order_intents WHERE status = ? ORDER BY created_at DESC LIMIT 1",
+        # Callers only pick the intent to load; skip the wide intent_json column.
+        "SELECT intent_id, status, created_at, symbol, side FROM order_intents "
+        "WHERE status = ? ORDER BY created_at DESC LIMIT 1",
         (status,),
     )
     return cur.fetchone()
@@ -564,7 +1030,6 @@ def insert_approval(
         """,
         (intent_id, intent_hash, approved_at, approved_by, approval_phrase_hash, approval_phrase),
     )
-    conn.commit()
 
 
 def get_approval(conn: sqlite3.Connection, intent_id: str) -> sqlite3.Row | None:
@@ -585,26 +1050,144 @@ def insert_execution(
     executed_at: str | None = None,
 ) -> None:
     executed_at = executed_at or utc_now_iso()
-    conn.execute(
-        """
-        INSERT INTO executions
-        (exec_id, intent_id, intent_hash, executed_at, mode, status, fee, slippage_model, details_json)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+    with transaction(conn):
+        conn.execute(
+            """
+            INSERT INTO executions
+            (exec_id, intent_id, intent_hash, executed_at, executed_at_ms, mode, status, fee,
+             slippage_model, details_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                exec_id,
+                intent_id,
+                intent_hash,
+                executed_at,
+                _iso_to_ms(executed_at),
+                mode,
+                status,
+                fee,
+                slippage_model,
+                compact_json(details),
+            ),
+        )
+        upsert_daily_stats(conn, day=_iso_day(executed_at), orders_delta=1, realized_delta=0.0)
+
+
+# Applies one fill to the materialized position with the same arithmetic as replaying
+# fills in ts order: buys add price * size + fee to cost, other sides reduce cost at
+# the running average unless the position is already flat. The WHERE clause skips
+# fills older than the last applied one; the caller rebuilds those symbols instead.
+_APPLY_FILL_SQL = """
+    INSERT INTO positions (symbol, size, cost_total, net_size, last_ts, open_size, open_ts)
+    VALUES (
+        :symbol,
+        CASE WHEN :side = 'buy' THEN :size ELSE 0.0 END,
+        CASE WHEN :side = 'buy' THEN :price * :size + :fee ELSE 0.0 END,
+        CASE :side WHEN 'buy' THEN :size WHEN 'sell' THEN -:size ELSE 0.0 END,
+        :ts,
+        CASE WHEN :side = 'buy' THEN :size ELSE 0.0 END,
+        CASE WHEN :side = 'buy' THEN :ts END
+    )
+    ON CONFLICT(symbol) DO UPDATE SET
+        size = CASE
+            WHEN :side = 'buy' THEN size + :size
+            WHEN size <= 0 THEN size
+            ELSE size - :size
+        END,
+        cost_total = CASE
+            WHEN :side = 'buy' THEN cost_total + (:price * :size + :fee)
+            WHEN size <= 0 THEN cost_total
+            ELSE cost_total - cost_total / size * :size
+        END,
+        net_size = net_size + CASE :side WHEN 'buy' THEN :size WHEN 'sell' THEN -:size ELSE 0.0 END,
+        last_ts = :ts,
+        open_size = CASE :side
+            WHEN 'buy' THEN open_size + :size
+            WHEN 'sell' THEN MAX(open_size - :size, 0.0)
+            ELSE open_size
+        END,
+        open_ts = CASE
+            WHEN :side = 'buy' AND open_size <= 0 THEN :ts
+            WHEN :side = 'sell' AND open_size - :size <= 0 THEN NULL
+            ELSE open_ts
+        END
+    WHERE :ts >= last_ts
+"""
+
+
+# Replays a symbol's fills in (ts, rowid) order with the same running-average arithmetic
+# as _APPLY_FILL_SQL. Each recursive step seeks the next fill through idx_fills_symbol_ts,
+# so the rebuild stays O(n log n) inside SQLite instead of looping over rows in Python.
+_REBUILD_POSITION_SQL = """
+    WITH RECURSIVE running(ts, rid, size, cost_total, open_size, open_ts) AS (
+        SELECT '', -1, 0.0, 0.0, 0.0, NULL
+        UNION ALL
+        SELECT f.ts, f.rowid,
+            CASE
+                WHEN f.side = 'buy' THEN r.size + f.size
+                WHEN r.size <= 0 THEN r.size
+                ELSE r.size - f.size
+            END,
+            CASE
+                WHEN f.side = 'buy' THEN r.cost_total + (f.price * f.size + f.fee)
+                WHEN r.size <= 0 THEN r.cost_total
+                ELSE r.cost_total - r.cost_total / r.size * f.size
+            END,
+            CASE f.side
+                WHEN 'buy' THEN r.open_size + f.size
+                WHEN 'sell' THEN MAX(r.open_size - f.size, 0.0)
+                ELSE r.open_size
+            END,
+            CASE
+                WHEN f.side = 'buy' AND r.open_size <= 0 THEN f.ts
+                WHEN f.side = 'sell' AND r.open_size - f.size <= 0 THEN NULL
+                ELSE r.open_ts
+            END
+        FROM running r
+        JOIN fills f ON f.rowid = (
+            SELECT rowid FROM fills
+            WHERE symbol = :symbol AND (ts, rowid) > (r.ts, r.rid)
+            ORDER BY ts, rowid
+            LIMIT 1
+        )
+    )
+    INSERT OR REPLACE INTO positions
+    (symbol, size, cost_total, net_size, last_ts, open_size, open_ts)
+    SELECT
+        :symbol,
+        size,
+        cost_total,
         (
-            exec_id,
-            intent_id,
-            intent_hash,
-            executed_at,
-            mode,
-            status,
-            fee,
-            slippage_model,
-            json.dumps(details, separators=(",", ":"), sort_keys=True),
+            SELECT COALESCE(
+                SUM(CASE side WHEN 'buy' THEN size WHEN 'sell' THEN -size ELSE 0 END), 0.0
+            )
+            FROM fills WHERE symbol = :symbol
         ),
-    )
-    conn.commit()
-    upsert_daily_stats(conn, day=_iso_day(executed_at), orders_delta=1, realized_delta=0.0)
+        ts,
+        open_size,
+        open_ts
+    FROM running
+    ORDER BY ts DESC, rid DESC
+    LIMIT 1
+"""
+
+
+def _rebuild_position(conn: sqlite3.Connection, symbol: str) -> None:
+    conn.execute(_REBUILD_POSITION_SQL, {"symbol": symbol})
+
+
+def _apply_fills_to_positions(
+    conn: sqlite3.Connection, fills: Iterable[dict[str, Any]]
+) -> None:
+    stale: set[str] = set()
+    for fill in fills:
+        if fill["symbol"] in stale:
+            continue
+        if conn.execute(_APPLY_FILL_SQL, fill).rowcount == 0:
+            stale.add(fill["symbol"])
+    for symbol in stale:
+        _rebuild_position(conn, symbol)
 
 
 def insert_fill(
@@ -619,15 +1202,43 @@ def insert_fill(
     fee_currency: str,
     ts: str,
 ) -> None:
-    conn.execute(
-        """
-        INSERT INTO fills
-        (fill_id, exec_id, symbol, side, size, price, fee, fee_currency, ts)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (fill_id, exec_id, symbol, side, size, price, fee, fee_currency, ts),
-    )
-    conn.commit()
+    with transaction(conn):
+        conn.execute(
+            """
+            INSERT INTO fills
+            (fill_id, exec_id, symbol, side, size, price, fee, fee_currency, ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (fill_id, exec_id, symbol, side, size, price, fee, fee_currency, ts),
+        )
+        _apply_fills_to_positions(
+            conn,
+            [{"symbol": symbol, "side": side, "size": size, "price": price, "fee": fee, "ts": ts}],
+        )
+
+
+def insert_fills_many(
+    conn: sqlite3.Connection,
+    rows: Iterable[tuple[str, str, str, str, float, float, float, str, str]],
+) -> None:
+    # rows: (fill_id, exec_id, symbol, side, size, price, fee, fee_currency, ts)
+    rows = list(rows)
+    with transaction(conn):
+        conn.executemany(
+            """
+            INSERT INTO fills
+            (fill_id, exec_id, symbol, side, size, price, fee, fee_currency, ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        _apply_fills_to_positions(
+            conn,
+            (
+                {"symbol": symbol, "side": side, "size": size, "price": price, "fee": fee, "ts": ts}
+                for _, _, symbol, side, size, price, fee, _, ts in rows
+            ),
+        )
 
 
 def insert_trade_result(
@@ -639,23 +1250,25 @@ def insert_trade_result(
     meta: dict[str, Any],
 ) -> None:
     created_at = utc_now_iso()
-    conn.execute(
-        """
-        INSERT INTO trade_results
-        (trade_id, intent_id, pnl_jpy, created_at, mode, meta_json)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (
-            trade_id,
-            intent_id,
-            pnl_jpy,
-            created_at,
-            mode,
-            json.dumps(meta, separators=(",", ":"), sort_keys=True),
-        ),
-    )
-    conn.commit()
-    upsert_daily_stats(conn, day=_iso_day(created_at), orders_delta=0, realized_delta=pnl_jpy)
+    with transaction(conn):
+        conn.execute(
+            """
+            INSERT INTO trade_results
+            (trade_id, intent_id, pnl_jpy, created_at, created_at_ms, mode, meta_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                trade_id,
+                intent_id,
+                pnl_jpy,
+                created_at,
+                _iso_to_ms(created_at),
+                mode,
+                compact_json(meta),
+            ),
+        )
+        # created_at comes from utc_now_iso(), so its first 10 chars are the UTC day.
+        upsert_daily_stats(conn, day=created_at[:10], orders_delta=0, realized_delta=pnl_jpy)
 
 
 def insert_order(
@@ -694,10 +1307,9 @@ def insert_order(
             size,
             price,
             status,
-            json.dumps(raw, separators=(",", ":"), sort_keys=True),
+            compact_json(raw),
         ),
     )
-    conn.commit()
 
 
 def upsert_daily_stats(
@@ -723,7 +1335,6 @@ def upsert_daily_stats(
             now,
         ),
     )
-    conn.commit()
 
 
 def insert_report(conn: sqlite3.Connection, record: ReportRecord) -> None:
@@ -736,12 +1347,11 @@ def insert_report(conn: sqlite3.Connection, record: ReportRecord) -> None:
         (
             record.run_id,
             record.period,
-            json.dumps(record.metrics, separators=(",", ":"), sort_keys=True),
+            compact_json(record.metrics),
             record.equity_curve_path,
             record.created_at,
         ),
     )
-    conn.commit()
 
 
 def log_event(conn: sqlite3.Connection, event: str, data: dict[str, Any]) -> None:
@@ -750,10 +1360,58 @@ def log_event(conn: sqlite3.Connection, event: str, data: dict[str, Any]) -> Non
         (
             utc_now_iso(),
             event,
-            json.dumps(data, separators=(",", ":"), sort_keys=True),
+            compact_json(data),
         ),
     )
-    conn.commit()
+
+
+def log_events(
+    conn: sqlite3.Connection, events: Iterable[tuple[str, dict[str, Any]]], ts: str | None = None
+) -> None:
+    ts = ts or utc_now_iso()
+    with transaction(conn):
+        conn.executemany(
+            "INSERT INTO audit_logs (ts, event, data_json) VALUES (?, ?, ?)",
+            (
+                (ts, event, compact_json(data))
+                for event, data in events
+            ),
+        )
+
+
+class AuditLogger:
+    # Buffers audit events and writes them with one executemany per flush. A flush
+    # happens once max_pending events are queued or the oldest event is older than
+    # max_delay_seconds (checked on the next log call); callers flush explicitly at
+    # natural boundaries such as the end of a runner cycle or before closing.
+
+    def __init__(self, max_pending: int = 256, max_delay_seconds: float = 1.0) -> None:
+        self.max_pending = max_pending
+        self.max_delay_seconds = max_delay_seconds
+        self._pending: list[tuple[str, str, str]] = []
+        self._oldest_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def log(self, conn: sqlite3.Connection, event: str, data: dict[str, Any]) -> None:
+        if not self._pending:
+            self._oldest_at = time.monotonic()
+        self._pending.append((utc_now_iso(), event, compact_json(data)))
+        if (
+            len(self._pending) >= self.max_pending
+            or time.monotonic() - self._oldest_at >= self.max_delay_seconds
+        ):
+            self.flush(conn)
+
+    def flush(self, conn: sqlite3.Connection) -> None:
+        if not self._pending:
+            return
+        with transaction(conn):
+            conn.executemany(
+                "INSERT INTO audit_logs (ts, event, data_json) VALUES (?, ?, ?)", self._pending
+            )
+        self._pending = []
 
 
 def list_audit_logs(
@@ -785,7 +1443,6 @@ def insert_alert(
         """,
         (symbol, condition, threshold, created_at),
     )
-    conn.commit()
     return int(cur.lastrowid)
 
 
@@ -801,7 +1458,6 @@ def list_alerts(conn: sqlite3.Connection, enabled_only: bool = False) -> list[sq
 
 def delete_alert(conn: sqlite3.Connection, alert_id: int) -> None:
     conn.execute("DELETE FROM alerts WHERE id = ?", (alert_id,))
-    conn.commit()
 
 
 def update_alert_triggered(
@@ -812,73 +1468,69 @@ def update_alert_triggered(
         "UPDATE alerts SET triggered_at = ?, enabled = ? WHERE id = ?",
         (triggered_at, enabled, alert_id),
     )
-    conn.commit()
 
 
 def get_daily_execution_count(conn: sqlite3.Connection, day: str) -> int:
     cur = conn.execute(
         """
-        SELECT COUNT(*) as cnt FROM executions
-        WHERE executed_at LIKE ?
+        SELECT COUNT(*) FROM executions
+        WHERE executed_at_ms >= ? AND executed_at_ms < ?
         """,
-        (f"{day}%",),
+        _day_bounds_ms(day),
     )
-    row = cur.fetchone()
-    return int(row["cnt"]) if row else 0
+    # Aggregates always return exactly one row; index it positionally.
+    return int(cur.fetchone()[0])
 
 
 def get_last_execution_time(conn: sqlite3.Connection) -> str | None:
-    cur = conn.execute(
-        "SELECT executed_at FROM executions ORDER BY executed_at DESC LIMIT 1"
-    )
-    row = cur.fetchone()
-    return str(row["executed_at"]) if row else None
+    value = conn.execute("SELECT MAX(executed_at) FROM executions").fetchone()[0]
+    return str(value) if value is not None else None
+
+
+def get_risk_counters(conn: sqlite3.Connection, day: str) -> tuple[float, int, str | None]:
+    # Daily PnL, daily execution count and last execution time in one statement; the
+    # pre-trade risk check needs all three per intent.
+    start_ms, end_ms = _day_bounds_ms(day)
+    row = conn.execute(
+        """
+        SELECT
+            (SELECT COALESCE(SUM(pnl_jpy), 0) FROM trade_results
+             WHERE created_at_ms >= ?1 AND created_at_ms < ?2),
+            (SELECT COUNT(*) FROM executions
+             WHERE executed_at_ms >= ?1 AND executed_at_ms < ?2),
+            (SELECT MAX(executed_at) FROM executions)
+        """,
+        (start_ms, end_ms),
+    ).fetchone()
+    last_exec = str(row[2]) if row[2] is not None else None
+    return float(row[0]), int(row[1]), last_exec
 
 
 def get_position_size(conn: sqlite3.Connection, symbol: str) -> float:
-    cur = conn.execute("SELECT side, size FROM fills WHERE symbol = ?", (symbol,))
-    position = 0.0
-    for row in cur.fetchall():
-        if row["side"] == "buy":
-            position += float(row["size"])
-        elif row["side"] == "sell":
-            position -= float(row["size"])
-    return position
+    cur = conn.execute("SELECT net_size FROM positions WHERE symbol = ?", (symbol,))
+    row = cur.fetchone()
+    return float(row["net_size"]) if row else 0.0
 
 
 def get_position_state(conn: sqlite3.Connection, symbol: str) -> tuple[float, float]:
-    cur = conn.execute(
-        "SELECT side, size, price, fee FROM fills WHERE symbol = ? ORDER BY ts ASC",
-        (symbol,),
-    )
-    size = 0.0
-    cost_total = 0.0
-    for row in cur.fetchall():
-        fill_size = float(row["size"])
-        fill_price = float(row["price"])
-        fee = float(row["fee"])
-        if row["side"] == "buy":
-            cost_total += fill_price * fill_size + fee
-            size += fill_size
-        else:
-            if size <= 0:
-                continue
-            avg_cost = cost_total / size if size > 0 else 0.0
-            cost_total -= avg_cost * fill_size
-            size -= fill_size
-    avg_cost = cost_total / size if size > 0 else 0.0
+    cur = conn.execute("SELECT size, cost_total FROM positions WHERE symbol = ?", (symbol,))
+    row = cur.fetchone()
+    if row is None:
+        return 0.0, 0.0
+    size = float(row["size"])
+    avg_cost = float(row["cost_total"]) / size if size > 0 else 0.0
     return size, avg_cost
 
 
 def get_latest_orderbook_snapshot(conn: sqlite3.Connection, symbol: str) -> sqlite3.Row | None:
     cur = conn.execute(
         """
-        SELECT * FROM orderbook_snapshots
+        SELECT symbol, ts, bid, ask, bid_size, ask_size FROM orderbook_snapshots
         WHERE symbol = ?
-        ORDER BY ts DESC
+          AND ts = (SELECT MAX(ts) FROM orderbook_snapshots WHERE symbol = ?)
         LIMIT 1
         """,
-        (symbol,),
+        (symbol, symbol),
     )
     return cur.fetchone()
 
@@ -886,13 +1538,12 @@ def get_latest_orderbook_snapshot(conn: sqlite3.Connection, symbol: str) -> sqli
 def get_daily_pnl(conn: sqlite3.Connection, day: str) -> float:
     cur = conn.execute(
         """
-        SELECT COALESCE(SUM(pnl_jpy), 0) as total FROM trade_results
-        WHERE created_at LIKE ?
+        SELECT COALESCE(SUM(pnl_jpy), 0) FROM trade_results
+        WHERE created_at_ms >= ? AND created_at_ms < ?
         """,
-        (f"{day}%",),
+        _day_bounds_ms(day),
     )
-    row = cur.fetchone()
-    return float(row["total"]) if row else 0.0
+    return float(cur.fetchone()[0])
 
 
 def list_news_features(
@@ -926,20 +1577,6 @@ def list_latest_news_with_features(conn: sqlite3.Connection, limit: int = 50) ->
     return cur.fetchall()
 
 
-def list_news_features_since(conn: sqlite3.Connection, since_iso: str) -> list[sqlite3.Row]:
-    cur = conn.execute(
-        """
-        SELECT nf.sentiment, nf.source_weight, na.observed_at
-        FROM news_features nf
-        JOIN news_articles na ON nf.article_id = na.id
-        WHERE na.observed_at >= ?
-        ORDER BY na.observed_at ASC
-        """,
-        (since_iso,),
-    )
-    return cur.fetchall()
-
-
 def list_reports(conn: sqlite3.Connection, limit: int = 50) -> list[sqlite3.Row]:
     cur = conn.execute(
         """
@@ -982,29 +1619,9 @@ def list_recent_candles(
 
 
 def get_position_open_time(conn: sqlite3.Connection, symbol: str) -> str | None:
-    cur = conn.execute(
-        """
-        SELECT side, size, ts FROM fills
-        WHERE symbol = ?
-        ORDER BY ts ASC
-        """,
-        (symbol,),
-    )
-    size = 0.0
-    open_ts: str | None = None
-    for row in cur.fetchall():
-        side = row["side"]
-        fill_size = float(row["size"])
-        if side == "buy":
-            if size <= 0:
-                open_ts = row["ts"]
-            size += fill_size
-        elif side == "sell":
-            size -= fill_size
-            if size <= 0:
-                size = 0.0
-                open_ts = None
-    return open_ts
+    cur = conn.execute("SELECT open_ts FROM positions WHERE symbol = ?", (symbol,))
+    row = cur.fetchone()
+    return row["open_ts"] if row else None
 
 
 def list_news_features_window(
@@ -1046,6 +1663,28 @@ def list_news_features_since(
     return cur.fetchall()
 
 
+def list_news_sentiment_buckets(
+    conn: sqlite3.Connection, published_after: str
+) -> list[sqlite3.Row]:
+    # Hourly buckets keyed on the UTC observed_at text; a zero or missing weight counts
+    # as 1.0 and avg_sentiment is per article, as in the previous Python loop.
+    cur = conn.execute(
+        """
+        SELECT substr(na.observed_at, 1, 13) || ':00:00+00:00' AS bucket,
+               SUM(COALESCE(nf.sentiment, 0) * COALESCE(NULLIF(nf.source_weight, 0), 1.0))
+                   / COUNT(*) AS avg_sentiment,
+               COUNT(*) AS count
+        FROM news_features nf
+        JOIN news_articles na ON nf.article_id = na.id
+        WHERE na.published_at >= ?
+        GROUP BY bucket
+        ORDER BY bucket ASC
+        """,
+        (published_after,),
+    )
+    return cur.fetchall()
+
+
 def list_news_items_between(
     conn: sqlite3.Connection, start_iso: str, end_iso: str
 ) -> list[sqlite3.Row]:
@@ -1065,7 +1704,7 @@ def list_candles_between(
 ) -> list[sqlite3.Row]:
     cur = conn.execute(
         """
-        SELECT * FROM candles
+        SELECT ts, open, high, low, close, volume FROM candles
         WHERE symbol = ? AND timeframe = ? AND ts >= ? AND ts <= ?
         ORDER BY ts ASC
         """,
@@ -1106,12 +1745,24 @@ def get_latest_candle_ts(conn: sqlite3.Connection, symbol: str, timeframe: str)
 def list_articles_without_features(
     conn: sqlite3.Connection, limit: int = 200, feature_version: str = "news_v1"
 ) -> list[sqlite3.Row]:
+    if feature_version == "news_v1":
+        cur = conn.execute(
+            """
+            SELECT * FROM news_articles
+            WHERE featured = 0
+            ORDER BY published_at ASC
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        return cur.fetchall()
     cur = conn.execute(
         """
         SELECT na.* FROM news_articles na
-        LEFT JOIN news_features nf
-            ON na.id = nf.article_id AND nf.feature_version = ?
-        WHERE nf.id IS NULL
+        WHERE NOT EXISTS (
+            SELECT 1 FROM news_features nf
+            WHERE nf.article_id = na.id AND nf.feature_version = ?
+        )
         ORDER BY na.published_at ASC
         LIMIT ?
         """,
@@ -1152,7 +1803,6 @@ def insert_external_balance(
         """,
         (exchange, currency, total, free, used, ts, raw_json),
     )
-    conn.commit()
 
 
 def insert_external_trade(
@@ -1170,8 +1820,7 @@ def insert_external_trade(
     ts: str,
     raw_json: str,
 ) -> bool:
-    before = conn.total_changes
-    conn.execute(
+    cur = conn.execute(
         """
         INSERT OR IGNORE INTO external_trades
         (trade_uid, exchange, trade_id, symbol, side, price, amount, cost, fee, fee_currency, ts, raw_json)
@@ -1192,8 +1841,43 @@ def insert_external_trade(
             raw_json,
         ),
     )
-    conn.commit()
-    return (conn.total_changes - before) > 0
+    return cur.rowcount > 0
+
+
+def insert_external_balances_many(
+    conn: sqlite3.Connection,
+    rows: Iterable[tuple[str, str, float, float, float, str, str]],
+) -> None:
+    # rows: (exchange, currency, total, free, used, ts, raw_json)
+    with transaction(conn):
+        conn.executemany(
+            """
+            INSERT INTO external_balances
+            (exchange, currency, total, free, used, ts, raw_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+
+
+def insert_external_trades_many(
+    conn: sqlite3.Connection,
+    rows: Iterable[
+        tuple[str, str, str | None, str, str, float, float, float, float, str, str, str]
+    ],
+) -> int:
+    # rows: (trade_uid, exchange, trade_id, symbol, side, price, amount, cost, fee,
+    #        fee_currency, ts, raw_json)
+    with transaction(conn):
+        cur = conn.executemany(
+            """
+            INSERT OR IGNORE INTO external_trades
+            (trade_uid, exchange, trade_id, symbol, side, price, amount, cost, fee, fee_currency, ts, raw_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    return max(cur.rowcount, 0)
 
 
 def list_external_trades_between(
@@ -1203,7 +1887,21 @@ def list_external_trades_between(
     end_iso: str | None,
     symbol: str | None = None,
 ) -> list[sqlite3.Row]:
-    query = "SELECT * FROM external_trades WHERE exchange = ?"
+    return list(iter_external_trades_between(conn, exchange, start_iso, end_iso, symbol))
+
+
+def iter_external_trades_between(
+    conn: sqlite3.Connection,
+    exchange: str,
+    start_iso: str | None,
+    end_iso: str | None,
+    symbol: str | None = None,
+) -> Iterator[sqlite3.Row]:
+    # raw_json is by far the widest column and only kept for audit; leave it out here.
+    query = (
+        "SELECT trade_uid, exchange, trade_id, symbol, side, price, amount, cost, fee, "
+        "fee_currency, ts FROM external_trades WHERE exchange = ?"
+    )
     params: list[Any] = [exchange]
     if symbol:
         query += " AND symbol = ?"
@@ -1215,21 +1913,20 @@ def list_external_trades_between(
         query += " AND ts <= ?"
         params.append(end_iso)
     query += " ORDER BY ts ASC"
-    cur = conn.execute(query, params)
-    return cur.fetchall()
+    # The cursor yields rows lazily, so a year of trades is never fully materialized.
+    return conn.execute(query, params)
 
 
 def get_latest_external_trade_ts(
     conn: sqlite3.Connection, exchange: str, symbol: str | None = None
 ) -> str | None:
-    query = "SELECT MAX(ts) as max_ts FROM external_trades WHERE exchange = ?"
+    query = "SELECT MAX(ts) FROM external_trades WHERE exchange = ?"
     params: list[Any] = [exchange]
     if symbol:
         query += " AND symbol = ?"
         params.append(symbol)
-    cur = conn.execute(query, params)
-    row = cur.fetchone()
-    return str(row["max_ts"]) if row and row["max_ts"] else None
+    value = conn.execute(query, params).fetchone()[0]
+    return str(value) if value else None
 
 
 def list_latest_external_balances(
@@ -1237,18 +1934,11 @@ def list_latest_external_balances(
 ) -> list[sqlite3.Row]:
     cur = conn.execute(
         """
-        SELECT b.*
-        FROM external_balances b
-        JOIN (
-            SELECT currency, MAX(ts) AS max_ts
-            FROM external_balances
-            WHERE exchange = ?
-            GROUP BY currency
-        ) latest
-          ON latest.currency = b.currency AND latest.max_ts = b.ts
-        WHERE b.exchange = ?
-        ORDER BY b.currency ASC
+        SELECT exchange, currency, total, free, used, ts
+        FROM external_balances_latest
+        WHERE exchange = ?
+        ORDER BY currency ASC
         """,
-        (exchange, exchange),
+        (exchange,),
     )
     return cur.fetchall()
@@ -28,40 +28,46 @@ def _build_ohlcv_from_trades(
     max_batches = 5
     trades: list[dict[str, Any]] = []
     since_cursor = since
+    first_ts: int | None = None
+    last_ts: int | None = None
     for _ in range(max_batches):
         batch = exchange.fetch_trades(symbol, since=since_cursor, limit=trade_limit)
         if not batch:
             break
         trades.extend(batch)
-        timestamps = [t.get("timestamp") for t in batch if t.get("timestamp") is not None]
+        timestamps = [t["timestamp"] for t in batch if t.get("timestamp") is not None]
         if not timestamps:
             break
-        last_ts = max(timestamps)
-        since_cursor = last_ts + 1
-        all_ts = [t.get("timestamp") for t in trades if t.get("timestamp") is not None]
-        if all_ts and max(all_ts) - min(all_ts) >= tf_ms * limit:
+        # Track the covered span incrementally instead of rescanning every trade so far.
+        batch_min = min(timestamps)
+        batch_max = max(timestamps)
+        first_ts = batch_min if first_ts is None else min(first_ts, batch_min)
+        last_ts = batch_max if last_ts is None else max(last_ts, batch_max)
+        since_cursor = batch_max + 1
+        if last_ts - first_ts >= tf_ms * limit:
             break
     buckets: dict[int, list[float]] = {}
     for trade in trades:
         ts = trade.get("timestamp")
         price = trade.get("price")
-        amount = trade.get("amount") or 0.0
         if ts is None or price is None:
             continue
+        price = float(price)
+        amount = float(trade.get("amount") or 0.0)
         bucket = int(ts // tf_ms) * tf_ms
-        if bucket not in buckets:
-            buckets[bucket] = [float(price), float(price), float(price), float(price), 0.0]
-        o, h, l, c, v = buckets[bucket]
-        h = max(h, float(price))
-        l = min(l, float(price))
-        c = float(price)
-        v += float(amount)
-        buckets[bucket] = [o, h, l, c, v]
-
-    ohlcv = []
-    for bucket in sorted(buckets.keys()):
-        o, h, l, c, v = buckets[bucket]
-        ohlcv.append([bucket, o, h, l, c, v])
+        candle = buckets.get(bucket)
+        if candle is None:
+            buckets[bucket] = [price, price, price, price, amount]
+            continue
+        # Update in place: [open, high, low, close, volume].
+        if price > candle[1]:
+            candle[1] = price
+        elif price < candle[2]:
+            candle[2] = price
+        candle[3] = price
+        candle[4] += amount
+
+    ohlcv = [[bucket, *buckets[bucket]] for bucket in sorted(buckets)]
     return ohlcv[-limit:]
 
 
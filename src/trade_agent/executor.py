@@ -1,10 +1,10 @@
 from __future__ import annotations
 
+import dataclasses
 import json
 import os
 import sqlite3
 import time
-import uuid
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Optional
@@ -25,24 +25,46 @@ class ExecutionResult:
     exec_id: Optional[str] = None
 
 
+def _new_id() -> str:
+    # exec/fill/trade ids are opaque keys; 128 random bits without building a UUID object.
+    return os.urandom(16).hex()
+
+
 def _intent_from_record(record: sqlite3.Row) -> OrderIntent:
-    payload = json.loads(record["intent_json"])
+    # order_intents stores every OrderIntent field as a column next to intent_json, so the
+    # intent is rebuilt without decoding JSON; the hash check below still covers it.
     return OrderIntent(
-        intent_id=payload["intent_id"],
-        created_at=payload["created_at"],
-        symbol=payload["symbol"],
-        side=payload["side"],
-        size=float(payload["size"]),
-        price=float(payload["price"]),
+        intent_id=record["intent_id"],
+        created_at=record["created_at"],
+        symbol=record["symbol"],
+        side=record["side"],
+        size=float(record["size"]),
+        price=float(record["price"]),
+        order_type=record["order_type"],
+        time_in_force=record["time_in_force"],
+        strategy=record["strategy"],
+        confidence=float(record["confidence"]),
+        rationale=record["rationale"],
+        rationale_features_ref=record["rationale_features_ref"],
+        expires_at=record["expires_at"],
+        mode=record["mode"],
+    )
+
+
+def _legacy_intent(record: sqlite3.Row, intent: OrderIntent) -> OrderIntent | None:
+    # Rows older than the order_type/time_in_force/rationale_features_ref columns got
+    # migration defaults (limit/GTC/NULL) there, so only intent_json holds the approved
+    # values. Accept the JSON intent when those three fields are the only difference.
+    payload = json.loads(record["intent_json"])
+    legacy = dataclasses.replace(
+        intent,
         order_type=payload.get("order_type", "limit"),
         time_in_force=payload.get("time_in_force", "GTC"),
-        strategy=payload["strategy"],
-        confidence=float(payload["confidence"]),
-        rationale=payload["rationale"],
         rationale_features_ref=payload.get("rationale_features_ref"),
-        expires_at=payload["expires_at"],
-        mode=payload["mode"],
     )
+    if legacy.to_dict() != payload:
+        return None
+    return legacy
 
 
 def _approval_ok(store: SQLiteStore, intent_id: str, intent_hash: str) -> bool:
@@ -53,29 +75,58 @@ def _approval_ok(store: SQLiteStore, intent_id: str, intent_hash: str) -> bool:
 
 
 def _autopilot_ok(settings: AppSettings, intent: OrderIntent) -> bool:
-    if not settings.autopilot.enabled:
+    autopilot = settings.autopilot
+    if not autopilot.enabled:
         return False
-    if intent.symbol not in settings.autopilot.symbol_whitelist:
+    if intent.symbol not in autopilot.symbol_whitelist:
         return False
-    notional = intent.price * intent.size
-    if notional > settings.autopilot.max_order_notional_jpy:
+    if intent.price * intent.size > autopilot.max_order_notional_jpy:
         return False
-    if settings.risk.max_loss_jpy_per_trade > settings.autopilot.max_loss_jpy_per_trade:
+    if settings.risk.max_loss_jpy_per_trade > autopilot.max_loss_jpy_per_trade:
         return False
-    if intent.confidence < settings.autopilot.min_confidence:
+    if intent.confidence < autopilot.min_confidence:
         return False
     return True
 
 
+# Price precision is static per listing, so ticks are resolved once per (exchange, symbol).
+_price_ticks: dict[tuple[str, str], float | None] = {}
+
+
 def _price_tick(exchange: object, symbol: str) -> float | None:
+    key = (str(getattr(exchange, "id", "")), symbol)
+    if key in _price_ticks:
+        return _price_ticks[key]
     try:
         market = exchange.market(symbol)
         precision = market.get("precision", {}).get("price")
-        if isinstance(precision, int) and precision >= 0:
-            return 10 ** (-precision)
     except Exception:  # noqa: BLE001
+        # Markets not loaded (or unknown symbol): retry on the next order.
         return None
-    return None
+    tick = None
+    if isinstance(precision, int) and precision >= 0:
+        tick = 10 ** (-precision)
+    _price_ticks[key] = tick
+    return tick
+
+
+# Recent orderbooks per (exchange, symbol) so a burst of post-only orders on one symbol
+# pays a single round-trip. The TTL is short enough that bid/ask stay current.
+_orderbook_cache: dict[tuple[str, str], tuple[float, dict]] = {}
+
+
+def _fetch_orderbook_cached(
+    exchange_client: ExchangeClient, symbol: str, ttl_seconds: float
+) -> dict:
+    key = (str(getattr(exchange_client.exchange, "id", "")), symbol)
+    now = time.monotonic()
+    cached = _orderbook_cache.get(key)
+    if cached is not None and now - cached[0] < ttl_seconds:
+        return cached[1]
+    orderbook = exchange_client.fetch_orderbook(symbol)
+    if ttl_seconds > 0:
+        _orderbook_cache[key] = (now, orderbook)
+    return orderbook
 
 
 def _emulate_post_only_price(
@@ -83,6 +134,7 @@ def _emulate_post_only_price(
     intent: OrderIntent,
     buffer_bps: float,
     use_tick: bool,
+    orderbook_ttl_seconds: float = 0.0,
 ) -> tuple[float, dict[str, object]]:
     details: dict[str, object] = {
         "maker_emulation": True,
@@ -91,8 +143,10 @@ def _emulate_post_only_price(
         "use_tick": use_tick,
     }
     try:
-        exchange_client.load_markets()
-        orderbook = exchange_client.fetch_orderbook(intent.symbol)
+        # ccxt keeps markets after the first load; only fetch them if nobody has yet.
+        if not getattr(exchange_client.exchange, "markets", None):
+            exchange_client.load_markets()
+        orderbook = _fetch_orderbook_cached(exchange_client, intent.symbol, orderbook_ttl_seconds)
     except Exception as exc:  # noqa: BLE001
         details["maker_emulation_error"] = str(exc)
         return intent.price, details
@@ -119,6 +173,40 @@ def _emulate_post_only_price(
     return price, details
 
 
+# Order status polling backs off from 50 ms to 1 s: quick fills are seen almost
+# immediately while slow ones cost at most one poll per second of rate-limit budget.
+_POLL_INITIAL_SECONDS = 0.05
+_POLL_MAX_SECONDS = 1.0
+
+
+def _poll_order(
+    exchange_client: ExchangeClient,
+    order_id: str,
+    symbol: str,
+    timeout_seconds: float,
+    fallback_price: float,
+    sleep=time.sleep,
+) -> tuple[str, float, float]:
+    deadline = time.monotonic() + timeout_seconds
+    status = "open"
+    filled = 0.0
+    avg_price = 0.0
+    delay = _POLL_INITIAL_SECONDS
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        info = exchange_client.fetch_order(order_id, symbol)
+        status = info.get("status", status)
+        filled = float(info.get("filled") or 0.0)
+        avg_price = float(info.get("average") or info.get("price") or fallback_price)
+        if status in {"closed", "filled"}:
+            break
+        sleep(min(delay, remaining))
+        delay = min(delay * 2, _POLL_MAX_SECONDS)
+    return status, filled, avg_price
+
+
 def _record_order(
     store: SQLiteStore,
     order_id: str,
@@ -155,18 +243,65 @@ def execute_intent(
     exchange_client: ExchangeClient | None = None,
 ) -> ExecutionResult:
     record = store.get_order_intent(intent_id)
+    return _execute_record(store, record, settings, mode, exchange_client)
+
+
+# Paper intents per batch transaction; also the IN (...) chunk for loading them.
+_EXECUTE_BATCH = 500
+
+
+def execute_intents(
+    store: SQLiteStore,
+    intent_ids: list[str],
+    settings: AppSettings,
+    mode: str,
+    exchange_client: ExchangeClient | None = None,
+) -> list[ExecutionResult]:
+    results: list[ExecutionResult] = []
+    for start in range(0, len(intent_ids), _EXECUTE_BATCH):
+        chunk = intent_ids[start : start + _EXECUTE_BATCH]
+        records = store.get_order_intents(chunk)
+        if mode == "paper":
+            # One commit per chunk. Each intent's risk checks still see the orders, fills
+            # and daily stats written by the ones before it on this connection.
+            with store.transaction():
+                results.extend(
+                    _execute_record(store, records.get(intent_id), settings, mode, exchange_client)
+                    for intent_id in chunk
+                )
+        else:
+            # Live orders poll the exchange; never hold the write lock across them.
+            results.extend(
+                _execute_record(store, records.get(intent_id), settings, mode, exchange_client)
+                for intent_id in chunk
+            )
+    return results
+
+
+def _execute_record(
+    store: SQLiteStore,
+    record: sqlite3.Row | None,
+    settings: AppSettings,
+    mode: str,
+    exchange_client: ExchangeClient | None,
+) -> ExecutionResult:
     if not record:
         return ExecutionResult(status="error", message="intent not found")
 
+    trading = settings.trading
+    paper = settings.paper
     intent = _intent_from_record(record)
     intent_hash = record["intent_hash"]
     if intent.hash() != intent_hash:
-        return ExecutionResult(status="rejected", message="intent hash mismatch")
+        legacy = _legacy_intent(record, intent)
+        if legacy is None or legacy.hash() != intent_hash:
+            return ExecutionResult(status="rejected", message="intent hash mismatch")
+        intent = legacy
     if intent_expired(intent):
-        store.update_order_intent_status(intent_id, "expired")
+        store.update_order_intent_status(intent.intent_id, "expired")
         return ExecutionResult(status="rejected", message="intent expired")
 
-    if settings.trading.require_approval and not _autopilot_ok(settings, intent):
+    if trading.require_approval and not _autopilot_ok(settings, intent):
         if not _approval_ok(store, intent.intent_id, intent_hash):
             return ExecutionResult(status="rejected", message="approval required")
 
@@ -183,7 +318,7 @@ def execute_intent(
         store,
         plan,
         settings.risk,
-        settings.trading,
+        trading,
         current_position=store.get_position_size(intent.symbol),
     )
     if not risk_result.approved or not risk_result.plan:
@@ -194,19 +329,19 @@ def execute_intent(
         return ExecutionResult(status="rejected", message="risk adjustment required; re-propose")
 
     if mode == "live":
-        if settings.trading.dry_run:
+        if trading.dry_run:
             return ExecutionResult(status="rejected", message="dry_run enabled")
         ack_env = os.getenv("I_UNDERSTAND_LIVE_TRADING", "").lower() == "true"
-        if not (settings.trading.i_understand_live_trading and ack_env):
+        if not (trading.i_understand_live_trading and ack_env):
             return ExecutionResult(status="rejected", message="live trading not acknowledged")
         if not has_credentials(settings.exchange):
             return ExecutionResult(status="rejected", message="missing API credentials")
 
-    exec_id = str(uuid.uuid4())
+    exec_id = _new_id()
     now = datetime.now(timezone.utc).isoformat()
 
     if mode == "paper":
-        rng = build_rng(settings.paper)
+        rng = build_rng(paper)
         snapshot = store.get_latest_orderbook_snapshot(intent.symbol)
         if snapshot:
             orderbook = OrderbookSnapshot(
@@ -217,71 +352,73 @@ def execute_intent(
                 ts=now,
             )
         else:
-            orderbook = estimate_orderbook_from_price(intent.price, settings.paper.spread_bps)
-
-        fill = simulate_fill(intent, orderbook, settings.paper, rng)
-        _record_order(
-            store,
-            order_id=exec_id,
-            exec_id=exec_id,
-            intent=intent,
-            mode=mode,
-            status=fill.status,
-            price=fill.price if fill.filled else intent.price,
-            raw={
-                "message": fill.message,
-                "filled": fill.filled,
-                "orderbook": orderbook.__dict__,
-                "slippage_bps": settings.paper.slippage_bps,
-            },
-            created_at=now,
-        )
-        store.save_execution(
-            ExecutionRecord(
+            orderbook = estimate_orderbook_from_price(intent.price, paper.spread_bps)
+
+        fill = simulate_fill(intent, orderbook, paper, rng)
+        # One commit for the order, execution, fill, position and daily stats rows.
+        with store.transaction():
+            _record_order(
+                store,
+                order_id=exec_id,
                 exec_id=exec_id,
-                intent_id=intent.intent_id,
-                intent_hash=intent_hash,
-                executed_at=now,
+                intent=intent,
                 mode=mode,
                 status=fill.status,
-                fee=fill.fee if fill.filled else 0.0,
-                slippage_model="paper_v1",
-                details={"message": fill.message},
+                price=fill.price if fill.filled else intent.price,
+                raw={
+                    "message": fill.message,
+                    "filled": fill.filled,
+                    "orderbook": orderbook.__dict__,
+                    "slippage_bps": paper.slippage_bps,
+                },
+                created_at=now,
             )
-        )
-        if fill.filled:
-            fill_id = str(uuid.uuid4())
-            store.save_fill(
-                FillRecord(
-                    fill_id=fill_id,
+            store.save_execution(
+                ExecutionRecord(
                     exec_id=exec_id,
-                    symbol=intent.symbol,
-                    side=intent.side,
-                    size=fill.size,
-                    price=fill.price,
-                    fee=fill.fee,
-                    fee_currency=fill.fee_currency,
-                    ts=now,
+                    intent_id=intent.intent_id,
+                    intent_hash=intent_hash,
+                    executed_at=now,
+                    mode=mode,
+                    status=fill.status,
+                    fee=fill.fee if fill.filled else 0.0,
+                    slippage_model="paper_v1",
+                    details={"message": fill.message},
                 )
             )
-            pnl = 0.0
-            notional = fill.price * fill.size
-            if intent.side == "sell":
-                _, avg_cost = store.get_position_state(intent.symbol)
-                pnl = (fill.price - avg_cost) * fill.size - fill.fee
-            store.save_trade_result(
-                trade_id=str(uuid.uuid4()),
-                intent_id=intent.intent_id,
-                pnl_jpy=pnl,
-                mode=mode,
-                meta={
-                    "fill_price": fill.price,
-                    "size": fill.size,
-                    "notional": notional,
-                    "fee": fill.fee,
-                },
-            )
-        store.update_order_intent_status(intent.intent_id, fill.status)
+            if fill.filled:
+                fill_id = _new_id()
+                store.save_fill(
+                    FillRecord(
+                        fill_id=fill_id,
+                        exec_id=exec_id,
+                        symbol=intent.symbol,
+                        side=intent.side,
+                        size=fill.size,
+                        price=fill.price,
+                        fee=fill.fee,
+                        fee_currency=fill.fee_currency,
+                        ts=now,
+                    )
+                )
+                pnl = 0.0
+                notional = fill.price * fill.size
+                if intent.side == "sell":
+                    _, avg_cost = store.get_position_state(intent.symbol)
+                    pnl = (fill.price - avg_cost) * fill.size - fill.fee
+                store.save_trade_result(
+                    trade_id=_new_id(),
+                    intent_id=intent.intent_id,
+                    pnl_jpy=pnl,
+                    mode=mode,
+                    meta={
+                        "fill_price": fill.price,
+                        "size": fill.size,
+                        "notional": notional,
+                        "fee": fill.fee,
+                    },
+                )
+            store.update_order_intent_status(intent.intent_id, fill.status)
         return ExecutionResult(status=fill.status, message=fill.message, exec_id=exec_id)
 
     if mode == "live":
@@ -290,109 +427,107 @@ def execute_intent(
         try:
             order_price = intent.price
             details: dict[str, object] = {"requested_price": intent.price, "maker_emulation": False}
-            if settings.trading.post_only and not exchange_client.exchange.has.get("postOnly"):
+            if trading.post_only and not exchange_client.exchange.has.get("postOnly"):
                 order_price, emulation_details = _emulate_post_only_price(
                     exchange_client,
                     intent,
-                    settings.trading.maker_emulation.buffer_bps,
-                    settings.trading.maker_emulation.use_tick,
+                    trading.maker_emulation.buffer_bps,
+                    trading.maker_emulation.use_tick,
+                    trading.maker_emulation.orderbook_ttl_ms / 1000,
                 )
                 details.update(emulation_details)
             order = exchange_client.create_limit_order(
-                intent.symbol, intent.side, intent.size, order_price, settings.trading.post_only
+                intent.symbol, intent.side, intent.size, order_price, trading.post_only
             )
             order_id = order.get("id")
-            deadline = time.time() + settings.trading.order_timeout_seconds
-            status = "open"
-            filled = 0.0
-            avg_price = 0.0
-            while time.time() < deadline:
-                info = exchange_client.fetch_order(order_id, intent.symbol)
-                status = info.get("status", status)
-                filled = float(info.get("filled") or 0.0)
-                avg_price = float(info.get("average") or info.get("price") or intent.price)
-                if status in {"closed", "filled"}:
-                    break
-                time.sleep(1)
+            status, filled, avg_price = _poll_order(
+                exchange_client,
+                order_id,
+                intent.symbol,
+                trading.order_timeout_seconds,
+                intent.price,
+            )
             if status not in {"closed", "filled"}:
                 exchange_client.cancel_order(order_id, intent.symbol)
                 status = "canceled"
-            _record_order(
-                store,
-                order_id=str(order_id or exec_id),
-                exec_id=exec_id,
-                intent=intent,
-                mode=mode,
-                status=status,
-                price=order_price,
-                raw={
-                    "order": order,
-                    "filled": filled,
-                    "avg_price": avg_price,
-                    **details,
-                },
-                created_at=now,
-            )
-            store.save_execution(
-                ExecutionRecord(
+            with store.transaction():
+                _record_order(
+                    store,
+                    order_id=str(order_id or exec_id),
                     exec_id=exec_id,
-                    intent_id=intent.intent_id,
-                    intent_hash=intent_hash,
-                    executed_at=now,
+                    intent=intent,
                     mode=mode,
                     status=status,
-                    fee=0.0,
-                    slippage_model="exchange",
-                    details={
-                        "order_id": order_id,
+                    price=order_price,
+                    raw={
+                        "order": order,
                         "filled": filled,
                         "avg_price": avg_price,
                         **details,
                     },
+                    created_at=now,
                 )
-            )
-            if filled > 0:
-                store.save_fill(
-                    FillRecord(
-                        fill_id=str(uuid.uuid4()),
+                store.save_execution(
+                    ExecutionRecord(
                         exec_id=exec_id,
-                        symbol=intent.symbol,
-                        side=intent.side,
-                        size=filled,
-                        price=avg_price,
+                        intent_id=intent.intent_id,
+                        intent_hash=intent_hash,
+                        executed_at=now,
+                        mode=mode,
+                        status=status,
                         fee=0.0,
-                        fee_currency=settings.trading.base_currency,
-                        ts=now,
+                        slippage_model="exchange",
+                        details={
+                            "order_id": order_id,
+                            "filled": filled,
+                            "avg_price": avg_price,
+                            **details,
+                        },
                     )
                 )
-            store.update_order_intent_status(intent.intent_id, status)
+                if filled > 0:
+                    store.save_fill(
+                        FillRecord(
+                            fill_id=_new_id(),
+                            exec_id=exec_id,
+                            symbol=intent.symbol,
+                            side=intent.side,
+                            size=filled,
+                            price=avg_price,
+                            fee=0.0,
+                            fee_currency=trading.base_currency,
+                            ts=now,
+                        )
+                    )
+                store.update_order_intent_status(intent.intent_id, status)
             return ExecutionResult(status=status, message="live execution", exec_id=exec_id)
         except Exception as exc:  # noqa: BLE001
-            _record_order(
-                store,
-                order_id=exec_id,
-                exec_id=exec_id,
-                intent=intent,
-                mode=mode,
-                status="error",
-                price=intent.price,
-                raw={"error": str(exc)},
-                created_at=now,
-            )
-            store.save_execution(
-                ExecutionRecord(
+            with store.transaction():
+                _record_order(
+                    store,
+                    order_id=exec_id,
                     exec_id=exec_id,
-                    intent_id=intent.intent_id,
-                    intent_hash=intent_hash,
-                    executed_at=now,
+                    intent=intent,
                     mode=mode,
                     status="error",
-                    fee=0.0,
-                    slippage_model="exchange",
-                    details={"error": str(exc)},
+                    price=intent.price,
+                    raw={"error": str(exc)},
+                    created_at=now,
                 )
-            )
-            store.update_order_intent_status(intent.intent_id, "error")
+                store.save_execution(
+                    ExecutionRecord(
+                        exec_id=exec_id,
+                        intent_id=intent.intent_id,
+                        intent_hash=intent_hash,
+                        executed_at=now,
+                        mode=mode,
+                        status="error",
+                        fee=0.0,
+                        slippage_model="exchange",
+                        details={"error": str(exc)},
+                    )
+                )
+                store.update_order_intent_status(intent.intent_id, "error")
             return ExecutionResult(status="error", message=str(exc), exec_id=exec_id)
 
     return ExecutionResult(status="error", message="unknown mode")
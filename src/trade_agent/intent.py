@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import hashlib
 import json
+import time
 import uuid
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import cached_property
 
 
 @dataclass
@@ -34,7 +36,7 @@ def _utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
-@dataclass
+@dataclass(frozen=True)
 class OrderIntent:
     intent_id: str
     created_at: str
@@ -69,11 +71,25 @@ class OrderIntent:
             "mode": self.mode,
         }
 
-    def canonical_json(self) -> str:
+    # Intents are immutable, so the canonical bytes and their hash are computed once
+    # (as_record, propose and the executor's hash check all ask for them).
+    @cached_property
+    def _canonical(self) -> str:
         return json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":"), ensure_ascii=True)
 
+    @cached_property
+    def _hash(self) -> str:
+        return hashlib.sha256(self._canonical.encode("utf-8")).hexdigest()
+
+    @cached_property
+    def expires_at_epoch(self) -> float:
+        return datetime.fromisoformat(self.expires_at).timestamp()
+
+    def canonical_json(self) -> str:
+        return self._canonical
+
     def hash(self) -> str:
-        return hashlib.sha256(self.canonical_json().encode("utf-8")).hexdigest()
+        return self._hash
 
     def as_record(self) -> dict[str, object]:
         return {
@@ -120,5 +136,4 @@ def from_plan(
 
 
 def intent_expired(intent: OrderIntent) -> bool:
-    expires = datetime.fromisoformat(intent.expires_at)
-    return _utc_now() >= expires
+    return time.time() >= intent.expires_at_epoch
@@ -2,10 +2,10 @@ from __future__ import annotations
 
 import csv
 import json
+import math
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from statistics import mean, stdev
 from typing import Iterable
 
 import sqlite3
@@ -27,16 +27,6 @@ class Metrics:
     num_trades: int
 
 
-def _max_drawdown(equity: list[float]) -> float:
-    peak = equity[0] if equity else 0.0
-    max_dd = 0.0
-    for value in equity:
-        peak = max(peak, value)
-        drawdown = peak - value
-        max_dd = max(max_dd, drawdown)
-    return max_dd
-
-
 def _parse_ts(value: str | None) -> float | None:
     if not value:
         return None
@@ -46,37 +36,64 @@ def _parse_ts(value: str | None) -> float | None:
         return None
 
 
+def _trade_ts(trade: dict) -> float | None:
+    # Rows from load_trades_from_db carry the indexed epoch-ms column; others are parsed.
+    created_ms = trade.get("created_at_ms")
+    if created_ms is not None:
+        return created_ms / 1000
+    return _parse_ts(trade.get("created_at"))
+
+
 def compute_metrics(
     trades: Iterable[dict],
     capital_jpy: float | None = None,
     start_at: str | None = None,
     end_at: str | None = None,
 ) -> tuple[Metrics, list[float]]:
-    pnl_list = [float(t.get("pnl_jpy", 0.0)) for t in trades]
-    equity = []
+    # Single pass over the trades: equity, drawdown, win/loss sums and timestamps are
+    # folded together (numpy is not a dependency, and trades may be a one-shot iterator).
+    pnl_list: list[float] = []
+    equity: list[float] = []
+    first_ts: float | None = None
+    last_ts: float | None = None
     running = 0.0
-    for pnl in pnl_list:
+    peak = 0.0
+    max_dd = 0.0
+    wins = 0
+    gross_profit = 0.0
+    gross_loss = 0.0
+    turnover = 0.0
+    fees = 0.0
+    for trade in trades:
+        pnl = float(trade.get("pnl_jpy", 0.0))
+        pnl_list.append(pnl)
         running += pnl
+        if not equity or running > peak:
+            peak = running
+        elif peak - running > max_dd:
+            max_dd = peak - running
         equity.append(running)
+        if pnl > 0:
+            wins += 1
+            gross_profit += pnl
+        elif pnl < 0:
+            gross_loss -= pnl
+        turnover += float(trade.get("notional_jpy", 0.0))
+        fees += float(trade.get("fee_jpy", 0.0))
+        ts = _trade_ts(trade)
+        if ts is not None:
+            if first_ts is None or ts < first_ts:
+                first_ts = ts
+            if last_ts is None or ts > last_ts:
+                last_ts = ts
 
-    wins = sum(1 for pnl in pnl_list if pnl > 0)
     num_trades = len(pnl_list)
     win_rate = wins / num_trades if num_trades else 0.0
-    turnover = sum(float(t.get("notional_jpy", 0.0)) for t in trades)
-    fees = sum(float(t.get("fee_jpy", 0.0)) for t in trades)
-
-    total_pnl = sum(pnl_list)
+    total_pnl = running
     total_return = total_pnl / capital_jpy if capital_jpy and capital_jpy > 0 else 0.0
-
-    gross_profit = sum(pnl for pnl in pnl_list if pnl > 0)
-    gross_loss = abs(sum(pnl for pnl in pnl_list if pnl < 0))
     profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0.0
 
-    timestamps = []
-    for trade in trades:
-        ts = _parse_ts(trade.get("created_at"))
-        if ts is not None:
-            timestamps.append(ts)
+    timestamps = [ts for ts in (first_ts, last_ts) if ts is not None]
     if start_at:
         ts = _parse_ts(start_at)
         if ts is not None:
@@ -95,17 +112,20 @@ def compute_metrics(
             cagr = (1 + total_return) ** (1 / years) - 1
 
     sharpe = 0.0
-    if capital_jpy and capital_jpy > 0 and len(pnl_list) >= 2:
+    if capital_jpy and capital_jpy > 0 and num_trades >= 2:
+        # Float mean / sample stdev; statistics.stdev goes through exact fractions.
         returns = [pnl / capital_jpy for pnl in pnl_list]
-        if stdev(returns) > 0:
-            sharpe = mean(returns) / stdev(returns) * (len(returns) ** 0.5)
+        avg = math.fsum(returns) / num_trades
+        std = math.sqrt(math.fsum((r - avg) ** 2 for r in returns) / (num_trades - 1))
+        if std > 0:
+            sharpe = avg / std * math.sqrt(num_trades)
 
     metrics = Metrics(
         total_pnl=total_pnl,
         total_return=total_return,
         cagr=cagr,
         sharpe=sharpe,
-        max_drawdown=_max_drawdown(equity),
+        max_drawdown=max_dd,
         win_rate=win_rate,
         profit_factor=profit_factor,
         turnover=turnover,
@@ -116,7 +136,7 @@ def compute_metrics(
 
 
 def load_trades_from_db(conn: sqlite3.Connection, mode: str | None = None) -> list[dict]:
-    query = "SELECT pnl_jpy, meta_json, created_at FROM trade_results"
+    query = "SELECT pnl_jpy, meta_json, created_at, created_at_ms FROM trade_results"
     params = []
     if mode:
         query += " WHERE mode = ?"
@@ -124,7 +144,7 @@ def load_trades_from_db(conn: sqlite3.Connection, mode: str | None = None) -> li
     query += " ORDER BY created_at ASC"
     cur = conn.execute(query, params)
     trades: list[dict] = []
-    for row in cur.fetchall():
+    for row in cur:
         meta = json.loads(row["meta_json"]) if row["meta_json"] else {}
         trades.append(
             {
@@ -132,6 +152,7 @@ def load_trades_from_db(conn: sqlite3.Connection, mode: str | None = None) -> li
                 "notional_jpy": float(meta.get("notional", 0.0)),
                 "fee_jpy": float(meta.get("fee", 0.0)),
                 "created_at": row["created_at"],
+                "created_at_ms": row["created_at_ms"],
             }
         )
     return trades
@@ -150,7 +171,7 @@ def load_trade_details_from_db(conn: sqlite3.Connection, mode: str | None = None
     query += " ORDER BY tr.created_at ASC"
     cur = conn.execute(query, params)
     rows: list[dict] = []
-    for row in cur.fetchall():
+    for row in cur:
         meta = json.loads(row["meta_json"]) if row["meta_json"] else {}
         rows.append(
             {
@@ -168,28 +189,28 @@ def load_trade_details_from_db(conn: sqlite3.Connection, mode: str | None = None
     return rows
 
 
+_TRADE_CSV_COLUMNS = (
+    "created_at",
+    "intent_id",
+    "mode",
+    "symbol",
+    "side",
+    "size",
+    "price",
+    "fee_jpy",
+    "pnl_jpy",
+)
+
+
 def save_trade_csv(trades: Iterable[dict], output_dir: str, prefix: str) -> str:
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     csv_path = Path(output_dir) / f"{prefix}_trades.csv"
     with open(csv_path, "w", encoding="utf-8", newline="") as handle:
         writer = csv.writer(handle)
-        writer.writerow(
-            ["created_at", "intent_id", "mode", "symbol", "side", "size", "price", "fee_jpy", "pnl_jpy"]
+        writer.writerow(_TRADE_CSV_COLUMNS)
+        writer.writerows(
+            [trade.get(column) for column in _TRADE_CSV_COLUMNS] for trade in trades
         )
-        for trade in trades:
-            writer.writerow(
-                [
-                    trade.get("created_at"),
-                    trade.get("intent_id"),
-                    trade.get("mode"),
-                    trade.get("symbol"),
-                    trade.get("side"),
-                    trade.get("size"),
-                    trade.get("price"),
-                    trade.get("fee_jpy"),
-                    trade.get("pnl_jpy"),
-                ]
-            )
     return str(csv_path)
 
 
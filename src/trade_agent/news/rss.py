@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Any
 from urllib.parse import urlparse
@@ -18,10 +19,29 @@ def _source_from_feed(feed: dict[str, Any], url: str) -> str:
     return urlparse(url).netloc.replace(".", "_").lower()
 
 
+_MAX_FEED_WORKERS = 8
+
+
+def _parse_one(url: str) -> tuple[Any, Exception | None]:
+    try:
+        return feedparser.parse(url), None
+    except Exception as exc:  # noqa: BLE001
+        return None, exc
+
+
+def _parse_feeds(urls: list[str]) -> list[tuple[Any, Exception | None]]:
+    # Feed downloads are network-bound, so fetch them concurrently; results keep URL order.
+    if len(urls) <= 1:
+        return [_parse_one(url) for url in urls]
+    with ThreadPoolExecutor(max_workers=min(_MAX_FEED_WORKERS, len(urls))) as pool:
+        return list(pool.map(_parse_one, urls))
+
+
 def fetch_entries(urls: list[str]) -> list[tuple[dict[str, Any], str]]:
     entries: list[tuple[dict[str, Any], str]] = []
-    for url in urls:
-        parsed = feedparser.parse(url)
+    for url, (parsed, error) in zip(urls, _parse_feeds(urls)):
+        if error is not None:
+            raise error
         source = _source_from_feed(parsed.feed, url)
         for entry in parsed.entries:
             entries.append((entry, source))
@@ -32,11 +52,9 @@ def ingest_rss(urls: list[str]) -> tuple[list[tuple[NewsItem, str]], dict[str, A
     observed_at = datetime.now(timezone.utc).isoformat()
     stats: dict[str, Any] = {"total": 0, "feeds": {}, "errors": []}
     items: list[tuple[NewsItem, str]] = []
-    for url in urls:
-        try:
-            parsed = feedparser.parse(url)
-        except Exception as exc:  # noqa: BLE001
-            stats["errors"].append({"url": url, "error": str(exc)})
+    for url, (parsed, error) in zip(urls, _parse_feeds(urls)):
+        if error is not None:
+            stats["errors"].append({"url": url, "error": str(error)})
             continue
 
         if getattr(parsed, "bozo", False) and getattr(parsed, "bozo_exception", None):
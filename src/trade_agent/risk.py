@@ -49,10 +49,7 @@ def evaluate_plan(
         return RiskResult(approved=False, reason="invalid size or price")
 
     if state is None:
-        day = _utc_day()
-        realized_pnl = store.get_daily_pnl(day)
-        daily_orders = store.get_daily_execution_count(day)
-        last_exec = store.get_last_execution_time()
+        realized_pnl, daily_orders, last_exec = store.get_risk_counters(_utc_day())
         last_exec_time = datetime.fromisoformat(last_exec) if last_exec else None
         position, avg_cost = store.get_position_state(plan.symbol)
         unrealized_pnl = (plan.price - avg_cost) * position if position > 0 else 0.0
@@ -75,6 +75,7 @@ class Runner:
         self.next_market_ts = now_ts
         self.next_news_ts = now_ts
         self.next_propose_ts = now_ts
+        self.next_maintenance_ts = now_ts + float(self.config.maintenance_seconds)
 
     def request_stop(self) -> None:
         self.stop_requested = True
@@ -301,6 +302,13 @@ class Runner:
                 self.backoff_seconds = 0
 
             self._write_state()
+            self.store.flush_audit_logs()
+            if self.config.maintenance_seconds > 0 and now_ts >= self.next_maintenance_ts:
+                try:
+                    self.store.run_maintenance()
+                except Exception as exc:  # noqa: BLE001
+                    self.logger.warning("runner.maintenance failed: %s", exc)
+                self.next_maintenance_ts = now_ts + float(self.config.maintenance_seconds)
 
             if once or self.stop_requested:
                 break
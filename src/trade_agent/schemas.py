@@ -6,6 +6,13 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # optional: pip install trade-agent[fast]
+    orjson = None
+
+_ORJSON_OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
 
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -39,6 +46,18 @@ def canonical_json(payload: dict[str, Any]) -> str:
     return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
 
 
+def compact_json(data: Any) -> str:
+    # Compact, key-sorted JSON for stored payloads (not hashed, unlike canonical_json).
+    # orjson is several times faster; anything it cannot encode (e.g. ints beyond
+    # 64 bits) goes through the stdlib.
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=_ORJSON_OPTIONS).decode()
+        except TypeError:
+            pass
+    return json.dumps(data, separators=(",", ":"), sort_keys=True)
+
+
 @dataclass
 class Candle:
     symbol: str
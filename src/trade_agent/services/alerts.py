@@ -82,37 +82,39 @@ def check_alerts(
     triggered: list[dict[str, Any]] = []
     rows = store.list_alerts(enabled_only=True)
     now = utc_now_iso()
-    for row in rows:
-        symbol = row["symbol"]
-        info = current_prices.get(symbol)
-        if not info or info.get("price") is None:
-            continue
-        price = float(info["price"])
-        threshold = float(row["threshold"])
-        condition = row["condition"]
-        match = False
-        if condition == "above":
-            match = price >= threshold
-        elif condition == "below":
-            match = price <= threshold
-        elif condition == "change_pct":
-            change_pct = info.get("change_pct")
-            if change_pct is None:
+    with store.transaction():
+        for row in rows:
+            symbol = row["symbol"]
+            info = current_prices.get(symbol)
+            if not info or info.get("price") is None:
                 continue
-            match = abs(float(change_pct)) * 100 >= threshold
-        if match:
-            store.update_alert_triggered(int(row["id"]), triggered_at=now, enabled=0)
-            payload = {
-                "id": int(row["id"]),
-                "symbol": symbol,
-                "condition": condition,
-                "threshold": threshold,
-                "triggered_at": now,
-                "current_price": price,
-                "change_pct": info.get("change_pct"),
-            }
-            store.log_event("alert_triggered", payload)
-            triggered.append(payload)
+            price = float(info["price"])
+            threshold = float(row["threshold"])
+            condition = row["condition"]
+            match = False
+            if condition == "above":
+                match = price >= threshold
+            elif condition == "below":
+                match = price <= threshold
+            elif condition == "change_pct":
+                change_pct = info.get("change_pct")
+                if change_pct is None:
+                    continue
+                match = abs(float(change_pct)) * 100 >= threshold
+            if match:
+                store.update_alert_triggered(int(row["id"]), triggered_at=now, enabled=0)
+                payload = {
+                    "id": int(row["id"]),
+                    "symbol": symbol,
+                    "condition": condition,
+                    "threshold": threshold,
+                    "triggered_at": now,
+                    "current_price": price,
+                    "change_pct": info.get("change_pct"),
+                }
+                triggered.append(payload)
+        if triggered:
+            store.log_events(("alert_triggered", payload) for payload in triggered)
     return triggered
 
 
@@ -379,7 +379,7 @@ def external_summary(
 ) -> dict[str, Any]:
     start_iso, end_iso = _normalize_range(start, end)
     exchange = settings.exchange.name
-    rows = store.list_external_trades_between(exchange, start_iso, end_iso, symbol)
+    rows = store.iter_external_trades_between(exchange, start_iso, end_iso, symbol)
 
     trades = []
     positions: dict[str, dict[str, float]] = {}
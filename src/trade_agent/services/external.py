@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime, timezone
 from typing import Any, Iterable
 
 from trade_agent.config import AppSettings
 from trade_agent.exchange import build_exchange, has_credentials
-from trade_agent.schemas import ensure_utc_iso, sha256_hex, utc_now_iso
+from trade_agent.schemas import (
+    canonical_json,
+    compact_json,
+    ensure_utc_iso,
+    sha256_hex,
+    utc_now_iso,
+)
 from trade_agent.store import SQLiteStore
 
 
@@ -22,7 +27,7 @@ def _trade_uid(exchange: str, trade: dict[str, Any]) -> str:
         "timestamp": trade.get("timestamp"),
         "datetime": trade.get("datetime"),
     }
-    return f"{exchange}:{sha256_hex(json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=True))}"
+    return f"{exchange}:{sha256_hex(canonical_json(payload))}"
 
 
 def _iso_to_ms(value: str) -> int | None:
@@ -93,19 +98,20 @@ def ingest_external(
     totals = balance.get("total") or {}
     free = balance.get("free") or {}
     used = balance.get("used") or {}
-    raw_balance = json.dumps(balance, separators=(",", ":"), sort_keys=True)
-    balance_rows = 0
-    for currency, total in totals.items():
-        store.save_external_balance(
-            exchange=exchange_name,
-            currency=str(currency),
-            total=float(total or 0.0),
-            free=float(free.get(currency) or 0.0),
-            used=float(used.get(currency) or 0.0),
-            ts=ts_iso,
-            raw_json=raw_balance,
+    raw_balance = compact_json(balance)
+    balance_rows = [
+        (
+            exchange_name,
+            str(currency),
+            float(total or 0.0),
+            float(free.get(currency) or 0.0),
+            float(used.get(currency) or 0.0),
+            ts_iso,
+            raw_balance,
         )
-        balance_rows += 1
+        for currency, total in totals.items()
+    ]
+    store.save_external_balances_many(balance_rows)
 
     trade_rows = 0
     errors: list[dict[str, str]] = []
@@ -121,39 +127,33 @@ def ingest_external(
         except Exception as exc:  # noqa: BLE001
             errors.append({"symbol": symbol, "error": str(exc)})
             continue
+        rows = []
         for trade in trades:
-            trade_uid = _trade_uid(exchange_name, trade)
             fee = trade.get("fee") or {}
-            fee_cost = float(fee.get("cost") or 0.0)
-            fee_currency = str(
-                fee.get("currency") or settings.trading.base_currency or ""
-            )
             price = float(trade.get("price") or 0.0)
             amount = float(trade.get("amount") or 0.0)
-            cost = float(trade.get("cost") or (price * amount))
-            side = str(trade.get("side") or "unknown").lower()
-            ts_iso = _trade_ts_iso(trade)
-            raw_trade = json.dumps(trade, separators=(",", ":"), sort_keys=True)
-            inserted = store.save_external_trade(
-                trade_uid=trade_uid,
-                exchange=exchange_name,
-                trade_id=str(trade.get("id")) if trade.get("id") else None,
-                symbol=str(trade.get("symbol") or symbol),
-                side=side,
-                price=price,
-                amount=amount,
-                cost=cost,
-                fee=fee_cost,
-                fee_currency=fee_currency,
-                ts=ts_iso,
-                raw_json=raw_trade,
+            rows.append(
+                (
+                    _trade_uid(exchange_name, trade),
+                    exchange_name,
+                    str(trade.get("id")) if trade.get("id") else None,
+                    str(trade.get("symbol") or symbol),
+                    str(trade.get("side") or "unknown").lower(),
+                    price,
+                    amount,
+                    float(trade.get("cost") or (price * amount)),
+                    float(fee.get("cost") or 0.0),
+                    str(fee.get("currency") or settings.trading.base_currency or ""),
+                    _trade_ts_iso(trade),
+                    compact_json(trade),
+                )
             )
-            if inserted:
-                trade_rows += 1
+        # One transaction per symbol instead of one commit per trade.
+        trade_rows += store.save_external_trades_many(rows)
 
     result = {
         "exchange": exchange_name,
-        "balances": balance_rows,
+        "balances": len(balance_rows),
         "trades": trade_rows,
         "errors": errors,
     }
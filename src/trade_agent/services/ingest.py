@@ -59,6 +59,7 @@ def ingest(settings: AppSettings, store: SQLiteStore, params: IngestParams) -> d
     do_news = params.news_only or not (params.features_only or params.market_only)
     do_features = params.features_only or not (params.news_only or params.market_only)
 
+    snapshots: list[tuple[str, float, float, float, float, int]] = []
     if do_market:
         for sym in symbols:
             for timeframe in settings.trading.timeframes:
@@ -88,19 +89,22 @@ def ingest(settings: AppSettings, store: SQLiteStore, params: IngestParams) -> d
                     ts = int(
                         ob.get("timestamp") or int(datetime.now(timezone.utc).timestamp() * 1000)
                     )
-                    store.save_orderbook_snapshot(sym, bid, ask, bid_size, ask_size, ts)
+                    snapshots.append((sym, bid, ask, bid_size, ask_size, ts))
                 except Exception as exc:  # noqa: BLE001
                     ingest_errors.append({"symbol": sym, "orderbook": True, "error": str(exc)})
+        if snapshots:
+            store.save_orderbook_snapshots(snapshots)
 
     news_stats: dict[str, Any] = {}
     if do_news and settings.news.rss_urls:
         items, news_stats = ingest_rss(settings.news.rss_urls)
         inserted_total = 0
         feed_inserted: dict[str, int] = {}
-        for item, feed_url in items:
-            if store.save_news_item(item) is not None:
-                inserted_total += 1
-                feed_inserted[feed_url] = feed_inserted.get(feed_url, 0) + 1
+        with store.transaction():
+            for item, feed_url in items:
+                if store.save_news_item(item) is not None:
+                    inserted_total += 1
+                    feed_inserted[feed_url] = feed_inserted.get(feed_url, 0) + 1
         news_stats["inserted"] = inserted_total
         for url, meta in news_stats.get("feeds", {}).items():
             meta["inserted"] = feed_inserted.get(url, 0)
@@ -109,19 +113,23 @@ def ingest(settings: AppSettings, store: SQLiteStore, params: IngestParams) -> d
     if do_features:
         feature_version = "news_v1"
         articles = store.list_articles_without_features(feature_version=feature_version)
+        feature_rows = []
         for row in articles:
             normalized = _news_item_from_row(row)
             features = extract_features(
                 normalized, settings.news.keyword_flags, settings.news.source_weights
             )
-            store.save_news_features(
-                article_id=int(row["id"]),
-                sentiment=features.sentiment,
-                keyword_flags=features.keyword_flags,
-                source_weight=features.source_weight,
-                language=features.language,
-                feature_version=feature_version,
+            feature_rows.append(
+                (
+                    int(row["id"]),
+                    features.sentiment,
+                    features.keyword_flags,
+                    features.source_weight,
+                    features.language,
+                    feature_version,
+                )
             )
+        store.save_news_features_many(feature_rows)
         features_added = len(articles)
 
     result = {
@@ -104,20 +104,11 @@ def latest_news_with_features(store: SQLiteStore, limit: int = 50) -> list[dict[
 
 def sentiment_timeline(store: SQLiteStore, hours: int = 24) -> list[dict[str, Any]]:
     cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
-    rows = store.list_news_features_since(cutoff.isoformat())
-    buckets: dict[str, dict[str, float]] = {}
-    for row in rows:
-        observed = datetime.fromisoformat(row["observed_at"])
-        bucket = observed.replace(minute=0, second=0, microsecond=0).isoformat()
-        sentiment = float(row["sentiment"] or 0.0)
-        weight = float(row["source_weight"] or 1.0)
-        entry = buckets.setdefault(bucket, {"sum": 0.0, "count": 0.0})
-        entry["sum"] += sentiment * weight
-        entry["count"] += 1.0
-
-    timeline = []
-    for bucket in sorted(buckets.keys()):
-        entry = buckets[bucket]
-        avg = entry["sum"] / entry["count"] if entry["count"] > 0 else 0.0
-        timeline.append({"bucket": bucket, "avg_sentiment": avg, "count": int(entry["count"])})
-    return timeline
+    return [
+        {
+            "bucket": row["bucket"],
+            "avg_sentiment": float(row["avg_sentiment"]),
+            "count": int(row["count"]),
+        }
+        for row in store.list_news_sentiment_buckets(cutoff.isoformat())
+    ]
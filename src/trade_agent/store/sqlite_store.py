@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import atexit
 import sqlite3
-from typing import Any, Iterable, Sequence
+import threading
+from array import array
+from contextlib import AbstractContextManager
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
 
 from trade_agent import db, metrics
 from trade_agent.intent import OrderIntent
@@ -18,13 +23,109 @@ from trade_agent.schemas import (
 )
 
 
+def _file_key(db_path: str) -> tuple[str, int] | None:
+    if db_path == ":memory:" or db_path.startswith("file:"):
+        return None
+    try:
+        path = Path(db_path).resolve()
+        return str(path), path.stat().st_ino
+    except OSError:
+        return None
+
+
+def _close_connection(conn: sqlite3.Connection) -> None:
+    # SQLite recommends PRAGMA optimize before closing a long-lived connection.
+    conn.execute("PRAGMA optimize")
+    conn.close()
+
+
+class _IdleConnections(dict):
+    # Parked connections for one thread, keyed by resolved path and tagged with the inode
+    # they were opened on. Cleared (and closed) when the owning thread exits.
+    def take(self, key: tuple[str, int]) -> sqlite3.Connection | None:
+        path, inode = key
+        parked = self.pop(path, None)
+        if parked is None:
+            return None
+        if parked[0] != inode:
+            # The file was replaced while the connection was parked.
+            _close_connection(parked[1])
+            return None
+        return parked[1]
+
+    def park(self, key: tuple[str, int], conn: sqlite3.Connection) -> bool:
+        path, inode = key
+        if path in self:
+            return False
+        self[path] = (inode, conn)
+        return True
+
+    def __del__(self) -> None:
+        for _, conn in self.values():
+            _close_connection(conn)
+
+
+# One parked connection per database file and thread. close() hands the connection back
+# here and the next store opened on the same thread reuses it, so per-request stores skip
+# connect() and the PRAGMA setup. Thread-local because connections are single-threaded.
+_idle = threading.local()
+
+
+def _idle_connections() -> _IdleConnections:
+    conns = getattr(_idle, "conns", None)
+    if conns is None:
+        conns = _idle.conns = _IdleConnections()
+    return conns
+
+
 class SQLiteStore:
-    def __init__(self, db_path: str) -> None:
-        self.conn = db.connect(db_path)
+    def __init__(self, db_path: str, pragmas: dict[str, Any] | None = None) -> None:
+        self._db_path = db_path
+        key = _file_key(db_path)
+        conn = None
+        if key is not None and pragmas is None:
+            conn = _idle_connections().take(key)
+        self.conn: sqlite3.Connection | None = conn or db.connect(db_path, pragmas=pragmas)
+        if key is None:
+            key = _file_key(db_path)  # connect() may have just created the file
+        # Connections opened with custom pragmas are never shared.
+        self._pool_key = key if pragmas is None else None
         db.init_db(self.conn)
+        self._audit: db.AuditLogger | None = None
 
     def close(self) -> None:
-        self.conn.close()
+        if self.conn is None:
+            return
+        if self._audit is not None:
+            self.flush_audit_logs()
+            atexit.unregister(self.flush_audit_logs)
+            self._audit = None
+        conn, self.conn = self.conn, None
+        if (
+            self._pool_key is not None
+            and not conn.in_transaction
+            and _file_key(self._db_path) == self._pool_key
+            and _idle_connections().park(self._pool_key, conn)
+        ):
+            return
+        _close_connection(conn)
+
+    def run_maintenance(self) -> None:
+        db.run_maintenance(self.conn)
+
+    def buffer_audit_logs(self, max_pending: int = 256, max_delay_seconds: float = 1.0) -> None:
+        # atexit runs on the main thread, which can only touch a main-thread connection;
+        # stores owned by worker threads (the web runner) flush per cycle and in close().
+        if self._audit is None and threading.current_thread() is threading.main_thread():
+            atexit.register(self.flush_audit_logs)
+        self._audit = db.AuditLogger(max_pending=max_pending, max_delay_seconds=max_delay_seconds)
+
+    def flush_audit_logs(self) -> None:
+        if self._audit is not None:
+            self._audit.flush(self.conn)
+
+    def transaction(self) -> AbstractContextManager[sqlite3.Connection]:
+        return db.transaction(self.conn)
 
     def save_candles(
         self, symbol: str, timeframe: str, candles: Iterable[list[Any]], source: str
@@ -36,6 +137,11 @@ class SQLiteStore:
     ) -> list[sqlite3.Row]:
         return db.fetch_candles(self.conn, symbol, timeframe, limit, since_ts=since_ts)
 
+    def fetch_candles_columnar(
+        self, symbol: str, timeframe: str, limit: int, since_ts: int | None = None
+    ) -> dict[str, array]:
+        return db.fetch_candles_columnar(self.conn, symbol, timeframe, limit, since_ts=since_ts)
+
     def list_candles_between(
         self, symbol: str, timeframe: str, start_ts: int, end_ts: int
     ) -> list[sqlite3.Row]:
@@ -62,6 +168,11 @@ class SQLiteStore:
     ) -> None:
         db.insert_orderbook_snapshot(self.conn, symbol, bid, ask, bid_size, ask_size, ts)
 
+    def save_orderbook_snapshots(
+        self, rows: Iterable[tuple[str, float, float, float, float, int]]
+    ) -> None:
+        db.insert_orderbook_snapshots_many(self.conn, rows)
+
     def get_latest_orderbook_snapshot(self, symbol: str) -> sqlite3.Row | None:
         return db.get_latest_orderbook_snapshot(self.conn, symbol)
 
@@ -85,9 +196,10 @@ class SQLiteStore:
 
     def save_news_items(self, items: Sequence[NewsItem]) -> int:
         inserted = 0
-        for item in items:
-            if self.save_news_item(item) is not None:
-                inserted += 1
+        with self.transaction():
+            for item in items:
+                if self.save_news_item(item) is not None:
+                    inserted += 1
         return inserted
 
     def list_articles_without_features(
@@ -114,6 +226,11 @@ class SQLiteStore:
             feature_version=feature_version,
         )
 
+    def save_news_features_many(
+        self, rows: Iterable[tuple[int, float, dict[str, bool], float, str, str]]
+    ) -> int:
+        return db.insert_news_features_many(self.conn, rows)
+
     def list_news_features_window(
         self, start_iso: str, end_iso: str, observed_cutoff: str, limit: int = 500
     ) -> list[dict[str, Any]]:
@@ -143,6 +260,9 @@ class SQLiteStore:
     def list_news_features_since(self, since_iso: str) -> list[sqlite3.Row]:
         return db.list_news_features_since(self.conn, since_iso)
 
+    def list_news_sentiment_buckets(self, since_iso: str) -> list[sqlite3.Row]:
+        return db.list_news_sentiment_buckets(self.conn, since_iso)
+
     def save_feature_row(self, row: FeatureRow) -> int:
         return db.insert_feature_row(self.conn, row)
 
@@ -155,6 +275,9 @@ class SQLiteStore:
     def get_order_intent(self, intent_id: str) -> sqlite3.Row | None:
         return db.get_order_intent(self.conn, intent_id)
 
+    def get_order_intents(self, intent_ids: Iterable[str]) -> dict[str, sqlite3.Row]:
+        return db.get_order_intents(self.conn, intent_ids)
+
     def get_latest_intent(self, status: str = "proposed") -> sqlite3.Row | None:
         return db.get_latest_intent(self.conn, status=status)
 
@@ -245,6 +368,25 @@ class SQLiteStore:
             ts=record.ts,
         )
 
+    def save_fills(self, records: Iterable[FillRecord]) -> None:
+        db.insert_fills_many(
+            self.conn,
+            (
+                (
+                    record.fill_id,
+                    record.exec_id,
+                    record.symbol,
+                    record.side,
+                    record.size,
+                    record.price,
+                    record.fee,
+                    record.fee_currency,
+                    record.ts,
+                )
+                for record in records
+            ),
+        )
+
     def save_trade_result(
         self, trade_id: str, intent_id: str, pnl_jpy: float, mode: str, meta: dict[str, Any]
     ) -> None:
@@ -254,11 +396,18 @@ class SQLiteStore:
         db.insert_report(self.conn, record)
 
     def log_event(self, event: str, data: dict[str, Any]) -> None:
+        if self._audit is not None:
+            self._audit.log(self.conn, event, data)
+            return
         db.log_event(self.conn, event, data)
 
+    def log_events(self, events: Iterable[tuple[str, dict[str, Any]]]) -> None:
+        db.log_events(self.conn, events)
+
     def list_audit_logs(
         self, event: str | None = None, limit: int = 100
     ) -> list[sqlite3.Row]:
+        self.flush_audit_logs()
         return db.list_audit_logs(self.conn, event=event, limit=limit)
 
     def get_daily_pnl(self, day: str) -> float:
@@ -270,6 +419,9 @@ class SQLiteStore:
     def get_last_execution_time(self) -> str | None:
         return db.get_last_execution_time(self.conn)
 
+    def get_risk_counters(self, day: str) -> tuple[float, int, str | None]:
+        return db.get_risk_counters(self.conn, day)
+
     def get_position_size(self, symbol: str) -> float:
         return db.get_position_size(self.conn, symbol)
 
@@ -342,6 +494,19 @@ class SQLiteStore:
             raw_json=raw_json,
         )
 
+    def save_external_balances_many(
+        self, rows: Iterable[tuple[str, str, float, float, float, str, str]]
+    ) -> None:
+        db.insert_external_balances_many(self.conn, rows)
+
+    def save_external_trades_many(
+        self,
+        rows: Iterable[
+            tuple[str, str, str | None, str, str, float, float, float, float, str, str, str]
+        ],
+    ) -> int:
+        return db.insert_external_trades_many(self.conn, rows)
+
     def list_external_trades_between(
         self,
         exchange: str,
@@ -357,6 +522,21 @@ class SQLiteStore:
             symbol=symbol,
         )
 
+    def iter_external_trades_between(
+        self,
+        exchange: str,
+        start_iso: str | None,
+        end_iso: str | None,
+        symbol: str | None = None,
+    ) -> Iterator[sqlite3.Row]:
+        return db.iter_external_trades_between(
+            self.conn,
+            exchange=exchange,
+            start_iso=start_iso,
+            end_iso=end_iso,
+            symbol=symbol,
+        )
+
     def get_latest_external_trade_ts(
         self, exchange: str, symbol: str | None = None
     ) -> str | None:
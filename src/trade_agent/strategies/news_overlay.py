@@ -19,8 +19,27 @@ def generate_plan(
     base = baseline_plan(symbol, candles, risk, baseline_cfg)
     if base.side == "hold":
         return base
+    return _apply_sentiment(base, aggregate_sentiment(news_features), overlay_cfg)
 
-    sentiment = aggregate_sentiment(news_features)
+
+def generate_plan_from_sentiment(
+    symbol: str,
+    candles: Sequence[dict],
+    sentiment: float,
+    risk: RiskConfig,
+    baseline_cfg: StrategyBaselineConfig,
+    overlay_cfg: StrategyNewsOverlayConfig,
+) -> TradePlan:
+    # For callers that already track aggregated sentiment (the backtest's rolling window).
+    base = baseline_plan(symbol, candles, risk, baseline_cfg)
+    if base.side == "hold":
+        return base
+    return _apply_sentiment(base, sentiment, overlay_cfg)
+
+
+def _apply_sentiment(
+    base: TradePlan, sentiment: float, overlay_cfg: StrategyNewsOverlayConfig
+) -> TradePlan:
     size = base.size
     confidence = base.confidence
     rationale = base.rationale
@@ -1,18 +1,21 @@
 from __future__ import annotations
 
+import random
 from datetime import datetime, timezone
 from pathlib import Path
 
+from trade_agent import db
+from trade_agent.backtest import _NewsWindow, run_backtest
 from trade_agent.config import load_config, resolve_db_path
+from trade_agent.news.features import aggregate_feature_vector
 from trade_agent.store import SQLiteStore
-from trade_agent.backtest import run_backtest
 
 
 def _ms(ts: str) -> int:
     return int(datetime.fromisoformat(ts).timestamp() * 1000)
 
 
-def test_backtest_with_synthetic_news(tmp_path: Path) -> None:
+def _backtest_settings(tmp_path: Path):
     config_path = tmp_path / "config.yaml"
     config_path.write_text(
         f"""
@@ -45,15 +48,22 @@ news:
 """,
         encoding="utf-8",
     )
-    settings = load_config(str(config_path))
-    store = SQLiteStore(resolve_db_path(settings))
+    return load_config(str(config_path))
 
+
+def _save_candles(store: SQLiteStore) -> None:
     candles = []
     for idx, close in enumerate([100, 101, 102, 103, 102, 101, 100, 99, 98, 97]):
         ts = _ms(f"2024-01-01T00:0{idx}:00+00:00")
         candles.append([ts, close, close, close, close, 1.0])
     store.save_candles("BTC/JPY", "1m", candles, source="test")
 
+
+def test_backtest_with_synthetic_news(tmp_path: Path) -> None:
+    settings = _backtest_settings(tmp_path)
+    store = SQLiteStore(resolve_db_path(settings))
+    _save_candles(store)
+
     # Manually insert a news item and features.
     from trade_agent.schemas import NewsItem, sha256_hex
 
@@ -94,3 +104,61 @@ news:
     assert Path(result.metrics_path_csv).exists()
     assert Path(result.metrics_path_summary).exists()
     store.close()
+
+
+def test_backtest_survives_concurrent_writer(tmp_path: Path) -> None:
+    # Another process (runner, web UI) committing mid-backtest must not break the
+    # feature-row writes: no candle read may stay open across a write.
+    settings = _backtest_settings(tmp_path)
+    store = SQLiteStore(resolve_db_path(settings))
+    _save_candles(store)
+    other = db.connect(resolve_db_path(settings))
+    save_feature_row = store.save_feature_row
+
+    def save_after_other_commit(row):
+        db.insert_candles(other, "ETH/JPY", "1m", [[row.ts, 1, 1, 1, 1, 1]], source="test")
+        return save_feature_row(row)
+
+    store.save_feature_row = save_after_other_commit
+    result = run_backtest(
+        store,
+        settings,
+        "BTC/JPY",
+        "1m",
+        "2024-01-01",
+        "2024-01-01",
+        "baseline",
+        str(tmp_path / "reports"),
+    )
+    assert Path(result.metrics_path_json).exists()
+    assert store.conn.execute("SELECT COUNT(*) FROM feature_rows").fetchone()[0] == 10
+    other.close()
+    store.close()
+
+
+def test_news_window_matches_full_aggregation() -> None:
+    rng = random.Random(7)
+    features = sorted(
+        (
+            {
+                "sentiment": rng.uniform(-1, 1),
+                "source_weight": rng.uniform(0.1, 2.0),
+                "published_us": rng.randrange(0, 10_000),
+            }
+            for _ in range(200)
+        ),
+        key=lambda f: f["published_us"] + rng.randrange(0, 500),
+    )
+    window = _NewsWindow()
+    lookback = 2_000
+    for idx, feature in enumerate(features):
+        window.add(feature)
+        now = max(f["published_us"] for f in features[: idx + 1])
+        window.expire_before(now - lookback)
+        expected = aggregate_feature_vector(
+            [f for f in features[: idx + 1] if now - lookback <= f["published_us"]]
+        )
+        actual = window.feature_vector()
+        assert actual.keys() == expected.keys()
+        for key, value in expected.items():
+            assert abs(actual[key] - value) < 1e-9
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from trade_agent.config import load_config
+from trade_agent.config import DEFAULTS, _merge_dicts, load_config
 
 
 def test_config_overrides(tmp_path: Path) -> None:
@@ -28,3 +28,10 @@ backtest:
     assert settings.backtest.slippage_bps == 7
     assert settings.backtest.assume_taker is False
 
+
+def test_merge_dicts_does_not_mutate_defaults() -> None:
+    before = DEFAULTS["strategies"]["baseline"]["sma_period"]
+    merged = _merge_dicts(DEFAULTS, {"strategies": {"baseline": {"sma_period": before + 5}}})
+    assert merged["strategies"]["baseline"]["sma_period"] == before + 5
+    assert merged["strategies"]["news_overlay"] == DEFAULTS["strategies"]["news_overlay"]
+    assert DEFAULTS["strategies"]["baseline"]["sma_period"] == before
@@ -31,3 +31,138 @@ def test_init_db_adds_observed_at() -> None:
     assert "orders" in tables
     assert "daily_stats" in tables
     conn.close()
+
+
+def test_init_db_migrates_news_features_without_feature_version() -> None:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript(
+        """
+        CREATE TABLE news_articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            title TEXT NOT NULL,
+            source TEXT NOT NULL,
+            published_at TEXT NOT NULL,
+            ingested_at TEXT NOT NULL,
+            title_hash TEXT NOT NULL,
+            UNIQUE (url),
+            UNIQUE (title_hash)
+        );
+        CREATE TABLE news_features (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            article_id INTEGER NOT NULL,
+            sentiment REAL NOT NULL,
+            keyword_flags TEXT NOT NULL,
+            source_weight REAL NOT NULL,
+            language TEXT NOT NULL,
+            extracted_at TEXT NOT NULL,
+            FOREIGN KEY (article_id) REFERENCES news_articles(id)
+        );
+        INSERT INTO news_articles (url, title, source, published_at, ingested_at, title_hash)
+        VALUES
+            ('https://example.com/1', 'a', 'ex', '2024-01-01', '2024-01-01', 'h1'),
+            ('https://example.com/2', 'b', 'ex', '2024-01-01', '2024-01-01', 'h2');
+        INSERT INTO news_features
+            (article_id, sentiment, keyword_flags, source_weight, language, extracted_at)
+        VALUES (1, 0.1, '{}', 1.0, 'en', '2024-01-01');
+        """
+    )
+    db.init_db(conn)
+    featured = conn.execute("SELECT id, featured FROM news_articles ORDER BY id").fetchall()
+    assert [tuple(row) for row in featured] == [(1, 1), (2, 0)]
+    assert [row["id"] for row in db.list_articles_without_features(conn)] == [2]
+    conn.close()
+
+
+def test_schema_then_indexes_matches_init_db() -> None:
+    bulk = db.connect(":memory:")
+    db.init_schema(bulk)
+    candles = [[1700000000000 + i, 1, 1, 1, 1, 1] for i in range(10)]
+    db.insert_candles(bulk, "BTC/JPY", "1m", candles)
+    db.ensure_indexes(bulk)
+
+    fresh = db.connect(":memory:")
+    db.init_db(fresh)
+    query = "SELECT name FROM sqlite_master WHERE type = 'index' ORDER BY name"
+    assert bulk.execute(query).fetchall() == fresh.execute(query).fetchall()
+    bulk.close()
+    fresh.close()
+
+
+def test_range_helpers_use_ordered_index_scans() -> None:
+    conn = db.connect(":memory:")
+    db.init_db(conn)
+    queries = [
+        (
+            "SELECT * FROM candles WHERE symbol = ? AND timeframe = ? AND ts >= ? AND ts <= ? "
+            "ORDER BY ts ASC",
+            ("BTC/JPY", "1m", 0, 1),
+        ),
+        (
+            "SELECT * FROM feature_rows WHERE symbol = ? AND feature_version = ? "
+            "AND ts >= ? AND ts <= ? ORDER BY ts ASC",
+            ("BTC/JPY", "news_v1", 0, 1),
+        ),
+        (
+            "SELECT * FROM external_trades WHERE exchange = ? AND symbol = ? "
+            "AND ts >= ? AND ts <= ? ORDER BY ts ASC",
+            ("bitflyer", "BTC/JPY", "a", "b"),
+        ),
+        (
+            "SELECT * FROM external_trades WHERE exchange = ? AND ts >= ? ORDER BY ts ASC",
+            ("bitflyer", "a"),
+        ),
+    ]
+    for query, params in queries:
+        plan = " ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params))
+        assert "USING INDEX" in plan
+        assert "TEMP B-TREE" not in plan
+    conn.close()
+
+
+def test_latest_external_balances_backfilled_and_maintained() -> None:
+    conn = db.connect(":memory:")
+    db.init_db(conn)
+    db.insert_external_balances_many(
+        conn,
+        [
+            ("ex", "JPY", 10.0, 10.0, 0.0, "2024-01-02T00:00:00+00:00", "{}"),
+            ("ex", "JPY", 5.0, 5.0, 0.0, "2024-01-01T00:00:00+00:00", "{}"),
+        ],
+    )
+    conn.execute("DROP TRIGGER trg_external_balances_latest")
+    conn.execute("DROP TABLE external_balances_latest")
+    db.init_db(conn)
+    assert [row["total"] for row in db.list_latest_external_balances(conn, "ex")] == [10.0]
+
+    db.insert_external_balance(conn, "ex", "JPY", 7.0, 7.0, 0.0, "2024-01-01T12:00:00+00:00", "{}")
+    assert [row["total"] for row in db.list_latest_external_balances(conn, "ex")] == [10.0]
+    db.insert_external_balance(conn, "ex", "JPY", 8.0, 8.0, 0.0, "2024-01-02T00:00:00+00:00", "{}")
+    assert [row["total"] for row in db.list_latest_external_balances(conn, "ex")] == [8.0]
+    conn.close()
+
+
+def test_approvals_table_rebuilt_without_rowid() -> None:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    db.init_db(conn)
+    conn.executescript(
+        """
+        DROP TABLE approvals;
+        CREATE TABLE approvals (
+            intent_id TEXT PRIMARY KEY,
+            intent_hash TEXT NOT NULL,
+            approved_at TEXT NOT NULL,
+            approval_phrase TEXT NOT NULL
+        );
+        INSERT INTO approvals VALUES ('intent-1', 'hash', '2024-01-01T00:00:00+00:00', 'ok');
+        """
+    )
+    db.init_db(conn)
+    sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'approvals'").fetchone()[0]
+    assert "WITHOUT ROWID" in sql
+    row = db.get_approval(conn, "intent-1")
+    assert row["intent_hash"] == "hash"
+    assert row["approved_by"] == "local"
+    conn.close()
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import random
+from typing import Any
+
+from trade_agent.exchange import _build_ohlcv_from_trades
+
+
+class FakeTradesExchange:
+    id = "fake"
+    has = {"fetchTrades": True}
+
+    def __init__(self, trades: list[dict[str, Any]]) -> None:
+        self.trades = trades
+
+    def parse_timeframe(self, timeframe: str) -> int:
+        assert timeframe == "1m"
+        return 60
+
+    def fetch_trades(self, symbol: str, since: int, limit: int) -> list[dict[str, Any]]:
+        return [t for t in self.trades if t["timestamp"] >= since][:limit]
+
+
+def test_build_ohlcv_from_trades_matches_reference() -> None:
+    rng = random.Random(7)
+    start = 1700000000000
+    trades = [
+        {
+            "timestamp": start + idx * 1500,
+            "price": round(rng.uniform(90, 110), 2),
+            "amount": round(rng.uniform(0, 1), 3) if idx % 7 else None,
+        }
+        for idx in range(400)
+    ]
+    expected: dict[int, list[float]] = {}
+    for trade in trades:
+        bucket = trade["timestamp"] // 60000 * 60000
+        price = trade["price"]
+        amount = trade["amount"] or 0.0
+        if bucket not in expected:
+            expected[bucket] = [price, price, price, price, amount]
+        else:
+            candle = expected[bucket]
+            candle[1] = max(candle[1], price)
+            candle[2] = min(candle[2], price)
+            candle[3] = price
+            candle[4] += amount
+
+    ohlcv = _build_ohlcv_from_trades(FakeTradesExchange(trades), "BTC/JPY", "1m", 8, start)
+    assert ohlcv == [[bucket, *expected[bucket]] for bucket in sorted(expected)][-8:]
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import dataclasses
 import hashlib
+from datetime import datetime
 
-from trade_agent.intent import OrderIntent
+import pytest
+
+from trade_agent.intent import OrderIntent, TradePlan, from_plan, intent_expired
 
 
 def test_canonical_json_and_hash() -> None:
@@ -43,3 +47,43 @@ def test_canonical_json_and_hash() -> None:
     assert intent.canonical_json() == expected_json
     expected_hash = hashlib.sha256(expected_json.encode("utf-8")).hexdigest()
     assert intent.hash() == expected_hash
+
+
+def test_intent_is_frozen_and_hash_is_memoized() -> None:
+    intent = OrderIntent(
+        intent_id="test-id",
+        created_at="2024-01-01T00:00:00+00:00",
+        symbol="BTC/JPY",
+        side="buy",
+        size=0.1,
+        price=5000000.0,
+        order_type="limit",
+        time_in_force="GTC",
+        strategy="baseline",
+        confidence=0.7,
+        rationale="test",
+        rationale_features_ref=None,
+        expires_at="2024-01-01T00:15:00+00:00",
+        mode="paper",
+    )
+    first = intent.hash()
+    assert intent.hash() is first
+    assert intent.as_record()["intent_json"] is intent.canonical_json()
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        intent.price = 1.0  # type: ignore[misc]
+
+
+def test_intent_expired_uses_epoch() -> None:
+    plan = TradePlan(
+        symbol="BTC/JPY",
+        side="buy",
+        size=0.1,
+        price=100.0,
+        confidence=0.7,
+        rationale="test",
+        strategy="baseline",
+    )
+    assert not intent_expired(from_plan(plan, mode="paper", expiry_seconds=300))
+    expired = from_plan(plan, mode="paper", expiry_seconds=-1)
+    assert intent_expired(expired)
+    assert expired.expires_at_epoch == datetime.fromisoformat(expired.expires_at).timestamp()
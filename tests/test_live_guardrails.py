@@ -3,7 +3,12 @@ from __future__ import annotations
 from pathlib import Path
 
 from trade_agent.config import AppSettings, load_config, resolve_db_path
-from trade_agent.executor import execute_intent
+from trade_agent.executor import (
+    _fetch_orderbook_cached,
+    _poll_order,
+    _price_tick,
+    execute_intent,
+)
 from trade_agent.intent import TradePlan, from_plan
 from trade_agent.store import SQLiteStore
 
@@ -96,3 +101,66 @@ def test_live_rejects_missing_credentials(monkeypatch, tmp_path: Path) -> None:
     assert result.status == "rejected"
     assert result.message == "missing API credentials"
     store.close()
+
+
+class _FillsOnThirdPoll:
+    def __init__(self) -> None:
+        self.polls = 0
+
+    def fetch_order(self, order_id: str, symbol: str) -> dict:
+        self.polls += 1
+        if self.polls < 3:
+            return {"status": "open", "filled": 0.0}
+        return {"status": "closed", "filled": 1.0, "average": 1001.0}
+
+
+def test_poll_order_backs_off_until_filled() -> None:
+    client = _FillsOnThirdPoll()
+    sleeps: list[float] = []
+    status, filled, avg_price = _poll_order(
+        client, "order-1", "BTC/JPY", 30, 1000.0, sleep=sleeps.append
+    )
+    assert (status, filled, avg_price) == ("closed", 1.0, 1001.0)
+    assert sleeps == [0.05, 0.1]
+
+
+class _Markets:
+    id = "fake-tick"
+
+    def __init__(self) -> None:
+        self.lookups = 0
+        self.loaded = False
+
+    def market(self, symbol: str) -> dict:
+        self.lookups += 1
+        if not self.loaded:
+            raise KeyError(symbol)
+        return {"precision": {"price": 0}}
+
+
+def test_price_tick_cached_once_markets_load() -> None:
+    exchange = _Markets()
+    assert _price_tick(exchange, "BTC/JPY") is None
+    exchange.loaded = True
+    assert _price_tick(exchange, "BTC/JPY") == 1
+    assert _price_tick(exchange, "BTC/JPY") == 1
+    assert exchange.lookups == 2
+
+
+class _CountingOrderbooks:
+    def __init__(self) -> None:
+        self.exchange = type("Exchange", (), {"id": "fake-orderbook"})()
+        self.fetches = 0
+
+    def fetch_orderbook(self, symbol: str) -> dict:
+        self.fetches += 1
+        return {"bids": [[100.0 + self.fetches, 1.0]], "asks": [[102.0, 1.0]]}
+
+
+def test_orderbook_cache_reuses_recent_snapshot() -> None:
+    client = _CountingOrderbooks()
+    first = _fetch_orderbook_cached(client, "BTC/JPY", 60.0)
+    assert _fetch_orderbook_cached(client, "BTC/JPY", 60.0) is first
+    assert client.fetches == 1
+    assert _fetch_orderbook_cached(client, "BTC/JPY", 0.0) is not first
+    assert client.fetches == 2
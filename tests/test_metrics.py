@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+from statistics import mean, stdev
+
+import pytest
+
+from trade_agent.metrics import compute_metrics, save_trade_csv
+
+
+def test_compute_metrics_single_pass_matches_reference() -> None:
+    pnls = [120.0, -40.0, -90.0, 60.0, 0.0, 300.0, -250.0, 15.5]
+    trades = [
+        {
+            "pnl_jpy": pnl,
+            "notional_jpy": 1000.0,
+            "fee_jpy": 1.5,
+            "created_at": f"2024-01-{idx + 1:02d}T00:00:00+00:00",
+        }
+        for idx, pnl in enumerate(pnls)
+    ]
+
+    # A generator is consumed once; every metric must still see all trades.
+    metrics, equity = compute_metrics((t for t in trades), capital_jpy=100000.0)
+
+    running = 0.0
+    expected_equity = []
+    for pnl in pnls:
+        running += pnl
+        expected_equity.append(running)
+    peak = expected_equity[0]
+    max_dd = 0.0
+    for value in expected_equity:
+        peak = max(peak, value)
+        max_dd = max(max_dd, peak - value)
+    returns = [pnl / 100000.0 for pnl in pnls]
+
+    assert equity == expected_equity
+    assert metrics.num_trades == len(pnls)
+    assert metrics.total_pnl == sum(pnls)
+    assert metrics.max_drawdown == max_dd
+    assert metrics.win_rate == 4 / 8
+    assert metrics.profit_factor == pytest.approx(495.5 / 380.0)
+    assert metrics.turnover == 8000.0
+    assert metrics.fees == 12.0
+    assert metrics.sharpe == pytest.approx(mean(returns) / stdev(returns) * len(returns) ** 0.5)
+    assert metrics.cagr != 0.0
+
+
+def test_compute_metrics_empty() -> None:
+    metrics, equity = compute_metrics([], capital_jpy=100000.0)
+    assert equity == []
+    assert (metrics.num_trades, metrics.max_drawdown, metrics.sharpe) == (0, 0.0, 0.0)
+
+
+def test_save_trade_csv_writes_columns_in_order(tmp_path: Path) -> None:
+    trades = [
+        {
+            "created_at": "2024-01-01T00:00:00+00:00",
+            "intent_id": "intent-1",
+            "mode": "paper",
+            "symbol": "BTC/JPY",
+            "side": "buy",
+            "size": 0.1,
+            "price": 100.0,
+            "fee_jpy": 0.5,
+            "pnl_jpy": 0.0,
+        },
+        {"intent_id": "intent-2", "pnl_jpy": -1.0},
+    ]
+    path = save_trade_csv(iter(trades), str(tmp_path), "t")
+    with open(path, encoding="utf-8", newline="") as handle:
+        rows = list(csv.reader(handle))
+    assert rows[0] == [
+        "created_at",
+        "intent_id",
+        "mode",
+        "symbol",
+        "side",
+        "size",
+        "price",
+        "fee_jpy",
+        "pnl_jpy",
+    ]
+    assert rows[1] == [
+        "2024-01-01T00:00:00+00:00",
+        "intent-1",
+        "paper",
+        "BTC/JPY",
+        "buy",
+        "0.1",
+        "100.0",
+        "0.5",
+        "0.0",
+    ]
+    assert rows[2] == ["", "intent-2", "", "", "", "", "", "", "-1.0"]
+
+
+def test_compute_metrics_prefers_epoch_ms_timestamps() -> None:
+    iso = [{"pnl_jpy": 100.0, "created_at": "2024-01-01T00:00:00+00:00"}]
+    iso.append({"pnl_jpy": 50.0, "created_at": "2024-07-01T00:00:00+00:00"})
+    epoch = [
+        {"pnl_jpy": 100.0, "created_at": "not parsed", "created_at_ms": 1704067200000},
+        {"pnl_jpy": 50.0, "created_at": "not parsed", "created_at_ms": 1719792000000},
+    ]
+    from_iso, _ = compute_metrics(iso, capital_jpy=100000.0)
+    from_epoch, _ = compute_metrics(epoch, capital_jpy=100000.0)
+    assert from_epoch.cagr == pytest.approx(from_iso.cagr)
+    assert from_epoch.cagr > 0
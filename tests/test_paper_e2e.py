@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import sqlite3
 from pathlib import Path
 
+import pytest
+
 from trade_agent.config import load_config, resolve_db_path
-from trade_agent.executor import execute_intent
+from trade_agent.executor import execute_intent, execute_intents
 from trade_agent.intent import TradePlan, from_plan
 from trade_agent.store import SQLiteStore
 
 
-def test_paper_execution_deterministic(tmp_path: Path) -> None:
+def _paper_settings(tmp_path: Path):
     config_path = tmp_path / "config.yaml"
     config_path.write_text(
         """
@@ -40,9 +43,10 @@ paper:
         encoding="utf-8",
     )
 
-    settings = load_config(str(config_path))
-    store = SQLiteStore(resolve_db_path(settings))
+    return load_config(str(config_path))
+
 
+def _approved_intent(store: SQLiteStore):
     plan = TradePlan(
         symbol="BTC/JPY",
         side="buy",
@@ -55,6 +59,13 @@ paper:
     intent = from_plan(plan, mode="paper", expiry_seconds=300)
     store.save_order_intent(intent)
     store.save_approval_phrase(intent.intent_id, intent.hash(), "I APPROVE", "test")
+    return intent
+
+
+def test_paper_execution_deterministic(tmp_path: Path) -> None:
+    settings = _paper_settings(tmp_path)
+    store = SQLiteStore(resolve_db_path(settings))
+    intent = _approved_intent(store)
 
     store.save_orderbook_snapshot(
         symbol="BTC/JPY",
@@ -70,4 +81,146 @@ paper:
 
     fills = store.list_fills(symbol="BTC/JPY", limit=1)
     assert fills[0]["price"] == 101.0
+    assert not store.conn.in_transaction
+    store.close()
+
+
+def test_paper_execution_rolls_back_partial_records(tmp_path: Path, monkeypatch) -> None:
+    settings = _paper_settings(tmp_path)
+    store = SQLiteStore(resolve_db_path(settings))
+    intent = _approved_intent(store)
+
+    def _fail(**_kwargs) -> None:
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(store, "save_trade_result", _fail)
+    with pytest.raises(RuntimeError):
+        execute_intent(store, intent.intent_id, settings, mode="paper")
+
+    assert store.list_fills(symbol="BTC/JPY", limit=1) == []
+    assert store.get_position_size("BTC/JPY") == 0.0
+    assert store.conn.execute("SELECT COUNT(*) FROM executions").fetchone()[0] == 0
+    assert store.get_order_intent(intent.intent_id)["status"] == "proposed"
+    store.close()
+
+
+def test_paper_execution_rejects_edited_intent_columns(tmp_path: Path) -> None:
+    settings = _paper_settings(tmp_path)
+    store = SQLiteStore(resolve_db_path(settings))
+    intent = _approved_intent(store)
+    store.conn.execute(
+        "UPDATE order_intents SET size = 2.0 WHERE intent_id = ?", (intent.intent_id,)
+    )
+
+    result = execute_intent(store, intent.intent_id, settings, mode="paper")
+    assert (result.status, result.message) == ("rejected", "intent hash mismatch")
+    store.close()
+
+
+def test_pre_migration_intent_still_executes(tmp_path: Path) -> None:
+    settings = _paper_settings(tmp_path)
+    plan = TradePlan(
+        symbol="BTC/JPY",
+        side="buy",
+        size=1.0,
+        price=105.0,
+        confidence=0.7,
+        rationale="test",
+        strategy="baseline",
+    )
+    legacy = from_plan(plan, mode="paper", expiry_seconds=300, rationale_features_ref="feat-1")
+    edited = from_plan(plan, mode="paper", expiry_seconds=300, rationale_features_ref="feat-2")
+    # order_intents from before order_type/time_in_force/rationale_features_ref were columns;
+    # the migration fills them with limit/GTC/NULL while intent_json keeps the real values.
+    conn = sqlite3.connect(resolve_db_path(settings))
+    conn.execute(
+        """
+        CREATE TABLE order_intents (
+            intent_id TEXT PRIMARY KEY,
+            created_at TEXT NOT NULL,
+            intent_json TEXT NOT NULL,
+            intent_hash TEXT NOT NULL,
+            status TEXT NOT NULL,
+            expires_at TEXT NOT NULL,
+            strategy TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            side TEXT NOT NULL,
+            size REAL NOT NULL,
+            price REAL NOT NULL,
+            confidence REAL NOT NULL,
+            rationale TEXT NOT NULL,
+            mode TEXT NOT NULL
+        )
+        """
+    )
+    for intent, size in ((legacy, 1.0), (edited, 2.0)):
+        conn.execute(
+            "INSERT INTO order_intents VALUES (?, ?, ?, ?, 'proposed', ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                intent.intent_id,
+                intent.created_at,
+                intent.canonical_json(),
+                intent.hash(),
+                intent.expires_at,
+                intent.strategy,
+                intent.symbol,
+                intent.side,
+                size,
+                intent.price,
+                intent.confidence,
+                intent.rationale,
+                intent.mode,
+            ),
+        )
+    conn.commit()
+    conn.close()
+
+    store = SQLiteStore(resolve_db_path(settings))
+    row = store.get_order_intent(legacy.intent_id)
+    assert (row["order_type"], row["rationale_features_ref"]) == ("limit", None)
+    for intent in (legacy, edited):
+        store.save_approval_phrase(intent.intent_id, intent.hash(), "I APPROVE", "test")
+
+    result = execute_intent(store, legacy.intent_id, settings, mode="paper")
+    assert result.status == "filled"
+    # The legacy fallback only covers the migrated columns; other edits still fail.
+    result = execute_intent(store, edited.intent_id, settings, mode="paper")
+    assert (result.status, result.message) == ("rejected", "intent hash mismatch")
+    store.close()
+
+
+def test_expired_intent_is_marked_expired(tmp_path: Path) -> None:
+    settings = _paper_settings(tmp_path)
+    store = SQLiteStore(resolve_db_path(settings))
+    plan = TradePlan(
+        symbol="BTC/JPY",
+        side="buy",
+        size=1.0,
+        price=105.0,
+        confidence=0.7,
+        rationale="test",
+        strategy="baseline",
+    )
+    intent = from_plan(plan, mode="paper", expiry_seconds=-1)
+    store.save_order_intent(intent)
+
+    result = execute_intent(store, intent.intent_id, settings, mode="paper")
+    assert (result.status, result.message) == ("rejected", "intent expired")
+    assert store.get_order_intent(intent.intent_id)["status"] == "expired"
+    store.close()
+
+
+def test_execute_intents_batches_paper_intents(tmp_path: Path) -> None:
+    settings = _paper_settings(tmp_path)
+    settings.risk.max_orders_per_day = 2
+    store = SQLiteStore(resolve_db_path(settings))
+    intents = [_approved_intent(store) for _ in range(3)]
+    ids = [intents[0].intent_id, "missing", intents[1].intent_id, intents[2].intent_id]
+
+    results = execute_intents(store, ids, settings, mode="paper")
+    assert [r.status for r in results][:3] == ["filled", "error", "filled"]
+    # The daily order cap sees the executions written earlier in the same batch.
+    assert results[3].status == "rejected"
+    assert not store.conn.in_transaction
+    assert store.get_position_size("BTC/JPY") == pytest.approx(2.0)
     store.close()
@@ -25,3 +25,15 @@ def test_rss_ingest_fixture(tmp_path: Path) -> None:
             inserted_again += 1
     assert inserted_again == 0
     store.close()
+
+
+def test_rss_ingest_multiple_feeds_keeps_url_order(tmp_path: Path) -> None:
+    fixture = Path(__file__).parent / "fixtures" / "rss_sample.xml"
+    copy = tmp_path / "copy.xml"
+    copy.write_text(fixture.read_text(encoding="utf-8"), encoding="utf-8")
+    urls = [fixture.as_posix(), copy.as_posix()]
+
+    items, stats = ingest_rss(urls)
+    assert stats["total"] == 4
+    assert list(stats["feeds"]) == urls
+    assert [url for _, url in items] == [urls[0]] * 2 + [urls[1]] * 2
@@ -24,7 +24,14 @@ class FakeClock:
 
 
 class FakeStore:
-    pass
+    def __init__(self) -> None:
+        self.maintenance_runs = 0
+
+    def flush_audit_logs(self) -> None:
+        pass
+
+    def run_maintenance(self) -> None:
+        self.maintenance_runs += 1
 
 
 def make_settings(tmp_path: Path):
@@ -193,3 +200,26 @@ def test_runner_dedup_skips_identical(tmp_path: Path) -> None:
     )
     runner.run(max_cycles=2)
     assert calls["finalize"] == 1
+
+
+def test_runner_runs_periodic_maintenance(tmp_path: Path) -> None:
+    settings = make_settings(tmp_path)
+    settings.runner.maintenance_seconds = 2
+    clock = FakeClock()
+    store = FakeStore()
+
+    runner = Runner(
+        settings,
+        store,
+        ingest_fn=lambda *_args: {"errors": []},
+        prepare_proposal_fn=lambda *_args: ProposalCandidate(
+            status="rejected", plan=None, features_ref=None, reason="skip"
+        ),
+        finalize_proposal_fn=lambda *_args, **_kwargs: {},
+        now_fn=clock.now,
+        sleep_fn=clock.sleep,
+        state_path=tmp_path / "runner_state.json",
+        propose_params=ProposeParams(),
+    )
+    runner.run(max_cycles=5)
+    assert store.maintenance_runs == 2
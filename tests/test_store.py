@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from trade_agent import db
 from trade_agent.intent import OrderIntent
-from trade_agent.schemas import NewsItem, sha256_hex
-from trade_agent.store import SQLiteStore
+from trade_agent.schemas import ExecutionRecord, FillRecord, NewsItem, sha256_hex
+from trade_agent.store import SQLiteStore, sqlite_store
 
 
 def test_candle_dedupe() -> None:
@@ -15,6 +24,15 @@ def test_candle_dedupe() -> None:
     store.close()
 
 
+def test_candle_insert_counts_across_chunk_shapes() -> None:
+    store = SQLiteStore(":memory:")
+    candles = [[1700000000000 + idx * 60000, 1.0, 1.0, 1.0, 1.0, 1.0] for idx in range(1234)]
+    assert store.save_candles("BTC/JPY", "1m", candles[:37], source="test") == 37
+    assert store.save_candles("BTC/JPY", "1m", candles, source="test") == 1197
+    assert len(store.fetch_candles("BTC/JPY", "1m", limit=2000)) == 1234
+    store.close()
+
+
 def test_news_item_dedupe() -> None:
     store = SQLiteStore(":memory:")
     title = "Test News"
@@ -62,10 +80,9 @@ def test_news_item_utc_normalization() -> None:
     store.close()
 
 
-def test_order_intent_idempotent() -> None:
-    store = SQLiteStore(":memory:")
-    intent = OrderIntent(
-        intent_id="intent-1",
+def _intent(intent_id: str = "intent-1") -> OrderIntent:
+    return OrderIntent(
+        intent_id=intent_id,
         created_at="2024-01-01T00:00:00+00:00",
         symbol="BTC/JPY",
         side="buy",
@@ -80,8 +97,514 @@ def test_order_intent_idempotent() -> None:
         expires_at="2024-01-01T00:15:00+00:00",
         mode="paper",
     )
+
+
+def test_order_intent_idempotent() -> None:
+    store = SQLiteStore(":memory:")
+    intent = _intent()
     first = store.save_order_intent(intent)
     second = store.save_order_intent(intent)
     assert first is True
     assert second is False
     store.close()
+
+
+def test_transaction_rolls_back_on_error() -> None:
+    store = SQLiteStore(":memory:")
+    candles = [[1700000000000, 100.0, 110.0, 90.0, 105.0, 1.0]]
+    try:
+        with store.transaction():
+            store.save_candles("BTC/JPY", "1m", candles, source="test")
+            store.log_event("test", {"step": 1})
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert store.fetch_candles("BTC/JPY", "1m", limit=10) == []
+    assert store.list_audit_logs(event="test") == []
+
+    with store.transaction():
+        store.save_candles("BTC/JPY", "1m", candles, source="test")
+        store.log_event("test", {"step": 2})
+    assert not store.conn.in_transaction
+    assert len(store.fetch_candles("BTC/JPY", "1m", limit=10)) == 1
+    store.close()
+
+
+def test_concurrent_writers_serialize_without_busy_errors(tmp_path: Path) -> None:
+    path = str(tmp_path / "writers.db")
+    conn = db.connect(path)
+    db.init_db(conn)
+    conn.close()
+    errors: list[Exception] = []
+
+    def writer(offset: int) -> None:
+        conn = db.connect(path)
+        try:
+            for idx in range(50):
+                # Read before write: a deferred BEGIN would fail to upgrade its lock here.
+                with db.transaction(conn):
+                    conn.execute("SELECT COUNT(*) FROM candles").fetchone()
+                    time.sleep(0.001)
+                    db.insert_candles(conn, "BTC/JPY", "1m", [[offset + idx, 1, 1, 1, 1, 1]])
+        except sqlite3.OperationalError as exc:
+            errors.append(exc)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=writer, args=(n * 1000,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    conn = db.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM candles").fetchone()[0] == 200
+    conn.close()
+
+
+def test_save_news_features_many() -> None:
+    store = SQLiteStore(":memory:")
+    article_id = store.save_news_item(
+        NewsItem(
+            source_url="https://example.com/news/batch",
+            source_name="example",
+            guid="guid-batch",
+            title="Batch",
+            summary="summary",
+            published_at="2024-01-01T00:00:00+00:00",
+            observed_at="2024-01-01T00:00:00+00:00",
+            raw_payload_hash="payload",
+            title_hash=sha256_hex("Batch"),
+        )
+    )
+    assert article_id is not None
+    assert [r["id"] for r in store.list_articles_without_features()] == [article_id]
+    row = (article_id, 0.5, {"etf": True}, 1.0, "en", "news_v1")
+    assert store.save_news_features_many([row]) == 1
+    assert store.save_news_features_many([row]) == 0
+    assert store.list_articles_without_features() == []
+    store.close()
+
+
+def test_candles_table_rejects_type_drift() -> None:
+    store = SQLiteStore(":memory:")
+    with pytest.raises(sqlite3.IntegrityError):
+        store.conn.execute(
+            "INSERT INTO candles VALUES ('BTC/JPY', '1m', 1, 'x', 1, 1, 1, 1, 'test', 'now')"
+        )
+    store.close()
+
+
+def test_connect_applies_pragma_overrides() -> None:
+    store = SQLiteStore(":memory:", pragmas={"cache_size": -2000, "synchronous": "FULL"})
+    assert store.conn.execute("PRAGMA cache_size").fetchone()[0] == -2000
+    assert store.conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+    assert store.conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    store.close()
+
+
+def test_new_database_uses_larger_pages(tmp_path: Path) -> None:
+    path = str(tmp_path / "pages.db")
+    store = SQLiteStore(path)
+    store.close()
+    conn = db.connect(path)
+    assert conn.execute("PRAGMA page_size").fetchone()[0] == 8192
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+
+def test_daily_counters_use_day_range() -> None:
+    store = SQLiteStore(":memory:")
+    intent = _intent()
+    store.save_order_intent(intent)
+    for idx, executed_at in enumerate(
+        [
+            "2023-12-31T23:59:59.999999+00:00",
+            "2024-01-01T00:00:00+00:00",
+            "2024-01-01T23:59:59.999999+00:00",
+            "2024-01-02T00:00:00+00:00",
+        ]
+    ):
+        store.save_execution(
+            ExecutionRecord(
+                exec_id=f"exec-{idx}",
+                intent_id=intent.intent_id,
+                intent_hash=intent.hash(),
+                executed_at=executed_at,
+                mode="paper",
+                status="filled",
+                fee=0.0,
+                slippage_model="test",
+                details={},
+            )
+        )
+    assert store.get_daily_execution_count("2024-01-01") == 2
+    assert store.get_daily_execution_count("2023-12-31") == 1
+    assert store.get_daily_pnl("2024-01-01") == 0.0
+    assert store.get_risk_counters("2024-01-01") == (
+        0.0,
+        2,
+        "2024-01-02T00:00:00+00:00",
+    )
+
+    store.conn.execute("UPDATE executions SET executed_at_ms = NULL")
+    db.init_db(store.conn)
+    assert store.get_daily_execution_count("2024-01-01") == 2
+    store.close()
+
+
+def _replay_position(fills: list[tuple[str, float, float, float, str]]) -> tuple[float, float]:
+    size = 0.0
+    cost_total = 0.0
+    for side, fill_size, price, fee, _ in sorted(fills, key=lambda f: f[4]):
+        if side == "buy":
+            cost_total += price * fill_size + fee
+            size += fill_size
+        elif size > 0:
+            cost_total -= cost_total / size * fill_size
+            size -= fill_size
+    return size, (cost_total / size if size > 0 else 0.0)
+
+
+def _replay_open_time(fills: list[tuple[str, float, float, float, str]]) -> str | None:
+    size = 0.0
+    open_ts: str | None = None
+    for side, fill_size, _, _, ts in sorted(fills, key=lambda f: f[4]):
+        if side == "buy":
+            if size <= 0:
+                open_ts = ts
+            size += fill_size
+        elif side == "sell":
+            size -= fill_size
+            if size <= 0:
+                size = 0.0
+                open_ts = None
+    return open_ts
+
+
+def test_materialized_position_matches_fill_replay() -> None:
+    rng = random.Random(3)
+    store = SQLiteStore(":memory:")
+    intent = _intent()
+    store.save_order_intent(intent)
+    store.save_execution(
+        ExecutionRecord(
+            exec_id="exec-1",
+            intent_id=intent.intent_id,
+            intent_hash=intent.hash(),
+            executed_at="2024-01-01T00:00:00+00:00",
+            mode="paper",
+            status="filled",
+            fee=0.0,
+            slippage_model="test",
+            details={},
+        )
+    )
+    fills: list[tuple[str, float, float, float, str]] = []
+    for idx in range(60):
+        side = rng.choice(["buy", "buy", "sell"])
+        fill = (
+            side,
+            round(rng.uniform(0.01, 1.0), 4),
+            round(rng.uniform(90, 110), 2),
+            round(rng.uniform(0, 1), 4),
+            # Mostly increasing timestamps with the occasional late arrival.
+            f"2024-01-01T{(idx + rng.choice([0, 0, 0, -5])) % 60:02d}:00:{idx % 60:02d}+00:00",
+        )
+        fills.append(fill)
+        record = FillRecord(
+            fill_id=f"fill-{idx}",
+            exec_id="exec-1",
+            symbol="BTC/JPY",
+            side=fill[0],
+            size=fill[1],
+            price=fill[2],
+            fee=fill[3],
+            fee_currency="JPY",
+            ts=fill[4],
+        )
+        if idx % 2:
+            store.save_fill(record)
+        else:
+            store.save_fills([record])
+        size, avg_cost = store.get_position_state("BTC/JPY")
+        expected_size, expected_avg = _replay_position(fills)
+        assert size == pytest.approx(expected_size, abs=1e-9)
+        assert avg_cost == pytest.approx(expected_avg, abs=1e-6)
+        assert store.get_position_open_time("BTC/JPY") == _replay_open_time(fills)
+    net = sum(f[1] if f[0] == "buy" else -f[1] for f in fills)
+    assert store.get_position_size("BTC/JPY") == pytest.approx(net)
+    assert store.get_position_state("ETH/JPY") == (0.0, 0.0)
+
+    before = store.get_position_state("BTC/JPY")
+    store.conn.execute("DELETE FROM positions")
+    db.init_db(store.conn)
+    assert store.get_position_state("BTC/JPY") == pytest.approx(before)
+    assert store.get_position_open_time("BTC/JPY") == _replay_open_time(fills)
+    store.close()
+
+
+def test_log_events_share_one_timestamp() -> None:
+    store = SQLiteStore(":memory:")
+    store.log_events([("alert_triggered", {"id": 1}), ("alert_triggered", {"id": 2})])
+    rows = store.list_audit_logs(event="alert_triggered")
+    assert len(rows) == 2
+    assert rows[0]["ts"] == rows[1]["ts"]
+    store.close()
+
+
+def test_fetch_candles_columnar() -> None:
+    store = SQLiteStore(":memory:")
+    candles = [[1700000000000 + idx * 60000, 1.0, 2.0, 0.5, 100.0 + idx, 3.0] for idx in range(3)]
+    store.save_candles("BTC/JPY", "1m", candles, source="test")
+    columns = store.fetch_candles_columnar("BTC/JPY", "1m", limit=10, since_ts=1700000060000)
+    assert list(columns["ts"]) == [1700000060000, 1700000120000]
+    assert list(columns["close"]) == [101.0, 102.0]
+    assert columns["close"].typecode == "d"
+    store.close()
+
+
+def test_buffered_audit_logs_flush_in_batches() -> None:
+    store = SQLiteStore(":memory:")
+    store.buffer_audit_logs(max_pending=3, max_delay_seconds=3600)
+    store.log_event("tick", {"n": 1})
+    store.log_event("tick", {"n": 2})
+    count = store.conn.execute("SELECT COUNT(*) FROM audit_logs").fetchone()[0]
+    assert count == 0
+    store.log_event("tick", {"n": 3})
+    count = store.conn.execute("SELECT COUNT(*) FROM audit_logs").fetchone()[0]
+    assert count == 3
+    store.log_event("tick", {"n": 4})
+    assert len(store.list_audit_logs(event="tick")) == 4
+    store.close()
+
+
+def test_worker_thread_audit_buffer_skips_atexit(tmp_path: Path, monkeypatch) -> None:
+    registered: list[object] = []
+    monkeypatch.setattr("trade_agent.store.sqlite_store.atexit.register", registered.append)
+    db_path = str(tmp_path / "audit.db")
+
+    def _worker() -> None:
+        store = SQLiteStore(db_path)
+        store.buffer_audit_logs(max_pending=100, max_delay_seconds=3600)
+        store.log_event("tick", {"n": 1})
+        store.close()
+
+    thread = threading.Thread(target=_worker)
+    thread.start()
+    thread.join()
+    assert registered == []
+
+    store = SQLiteStore(db_path)
+    assert len(store.list_audit_logs(event="tick")) == 1
+    store.buffer_audit_logs()
+    assert registered == [store.flush_audit_logs]
+    store.close()
+
+
+def test_news_sentiment_buckets_group_by_observed_hour() -> None:
+    store = SQLiteStore(":memory:")
+    rows = []
+    for idx, (observed_at, sentiment, weight) in enumerate(
+        [
+            ("2024-01-01T05:10:00.123456+00:00", 0.5, 2.0),
+            ("2024-01-01T05:59:59+00:00", -0.25, 0.0),
+            ("2024-01-01T06:00:00+00:00", 1.0, 1.0),
+        ]
+    ):
+        article_id = store.save_news_item(
+            NewsItem(
+                source_url=f"https://example.com/news/{idx}",
+                source_name="example",
+                guid=f"guid-{idx}",
+                title=f"Title {idx}",
+                summary="summary",
+                published_at="2024-01-01T05:00:00+00:00",
+                observed_at=observed_at,
+                raw_payload_hash="payload",
+                title_hash=sha256_hex(f"Title {idx}"),
+            )
+        )
+        rows.append((article_id, sentiment, {}, weight, "en", "news_v1"))
+    store.save_news_features_many(rows)
+
+    buckets = [dict(row) for row in store.list_news_sentiment_buckets("2024-01-01T00:00:00")]
+    assert buckets == [
+        {"bucket": "2024-01-01T05:00:00+00:00", "avg_sentiment": 0.375, "count": 2},
+        {"bucket": "2024-01-01T06:00:00+00:00", "avg_sentiment": 1.0, "count": 1},
+    ]
+    store.close()
+
+
+def test_store_migrates_recreated_database_file(tmp_path: Path) -> None:
+    path = tmp_path / "recreated.db"
+    store = SQLiteStore(str(path))
+    store.close()
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+    sqlite3.connect(path).close()
+
+    store = SQLiteStore(str(path))
+    assert store.fetch_candles("BTC/JPY", "1m", limit=1) == []
+    store.close()
+
+
+def test_save_external_trades_many_skips_duplicates() -> None:
+    store = SQLiteStore(":memory:")
+    rows = [
+        (f"ex:{idx}", "ex", str(idx), "BTC/JPY", "buy", 100.0, 1.0, 100.0, 0.0, "JPY",
+         f"2024-01-01T00:00:0{idx}+00:00", "{}")
+        for idx in range(3)
+    ]
+    assert store.save_external_trades_many(rows) == 3
+    assert store.save_external_trades_many(rows[1:]) == 0
+    assert store.save_external_trades_many([]) == 0
+    assert store.get_latest_external_trade_ts("ex") == "2024-01-01T00:00:02+00:00"
+    trades = store.iter_external_trades_between("ex", "2024-01-01T00:00:01+00:00", None)
+    assert [row["trade_uid"] for row in trades] == ["ex:1", "ex:2"]
+    store.save_external_balances_many(
+        [
+            ("ex", "JPY", 10.0, 10.0, 0.0, "2024-01-01T00:00:00+00:00", "{}"),
+            ("ex", "BTC", 1.0, 1.0, 0.0, "2024-01-01T00:00:00+00:00", "{}"),
+            ("ex", "JPY", 20.0, 20.0, 0.0, "2024-01-02T00:00:00+00:00", "{}"),
+            ("other", "JPY", 99.0, 99.0, 0.0, "2024-01-03T00:00:00+00:00", "{}"),
+        ]
+    )
+    latest = store.list_latest_external_balances("ex")
+    assert [(row["currency"], row["total"]) for row in latest] == [("BTC", 1.0), ("JPY", 20.0)]
+    store.close()
+
+
+@pytest.fixture
+def idle_connections():
+    idle = sqlite_store._idle_connections()
+    yield idle
+    for _, conn in idle.values():
+        conn.close()
+    idle.clear()
+
+
+def test_closed_store_connection_is_reused_on_same_thread(tmp_path: Path, idle_connections) -> None:
+    path = str(tmp_path / "reuse.db")
+    first = SQLiteStore(path)
+    conn = first.conn
+    first.close()
+    assert first.conn is None
+    second = SQLiteStore(path)
+    custom = SQLiteStore(path, pragmas={"cache_size": -2000})
+    try:
+        assert second.conn is conn
+        assert second.fetch_candles("BTC/JPY", "1m", limit=1) == []
+        assert custom.conn is not conn
+
+        other: list[sqlite3.Connection] = []
+
+        def open_on_thread() -> None:
+            store = SQLiteStore(path)
+            other.append(store.conn)
+            store.close()
+
+        thread = threading.Thread(target=open_on_thread)
+        thread.start()
+        thread.join()
+        assert other[0] is not conn
+    finally:
+        second.close()
+        second.close()
+        custom.close()
+    assert idle_connections[str(Path(path).resolve())][1] is conn
+
+
+def test_parked_connection_is_dropped_when_file_is_replaced(
+    tmp_path: Path, idle_connections
+) -> None:
+    path = tmp_path / "replaced.db"
+    store = SQLiteStore(str(path))
+    parked = store.conn
+    store.close()
+    replacement = tmp_path / "replacement.db"
+    sqlite3.connect(replacement).close()
+    replacement.replace(path)
+
+    store = SQLiteStore(str(path))
+    try:
+        assert store.conn is not parked
+        assert store.fetch_candles("BTC/JPY", "1m", limit=1) == []
+    finally:
+        store.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        parked.execute("SELECT 1")
+
+
+def test_parked_connections_close_when_thread_exits(tmp_path: Path) -> None:
+    path = tmp_path / "thread.db"
+    wal_while_parked: list[bool] = []
+
+    def open_and_close() -> None:
+        store = SQLiteStore(str(path))
+        store.save_candles("BTC/JPY", "1m", [[1_700_000_000_000, 1.0, 1.0, 1.0, 1.0, 1.0]], "test")
+        store.close()
+        wal_while_parked.append(Path(f"{path}-wal").exists())
+
+    thread = threading.Thread(target=open_and_close)
+    thread.start()
+    thread.join()
+    assert wal_while_parked == [True]
+    # The last connection to a WAL database checkpoints and removes the -wal file on close.
+    assert not Path(f"{path}-wal").exists()
+
+
+def test_articles_without_features_for_other_versions() -> None:
+    store = SQLiteStore(":memory:")
+    ids = []
+    for idx in range(3):
+        ids.append(
+            store.save_news_item(
+                NewsItem(
+                    source_url=f"https://example.com/news/v2-{idx}",
+                    source_name="example",
+                    guid=f"guid-v2-{idx}",
+                    title=f"V2 {idx}",
+                    summary="summary",
+                    published_at=f"2024-01-0{idx + 1}T00:00:00+00:00",
+                    observed_at=f"2024-01-0{idx + 1}T00:00:00+00:00",
+                    raw_payload_hash="payload",
+                    title_hash=sha256_hex(f"V2 {idx}"),
+                )
+            )
+        )
+    store.save_news_features_many([(ids[1], 0.1, {}, 1.0, "en", "news_v2")])
+    pending = db.list_articles_without_features(store.conn, feature_version="news_v2")
+    assert [row["id"] for row in pending] == [ids[0], ids[2]]
+    store.close()
+
+
+def test_transaction_rolls_back_all_helper_writes(tmp_path: Path) -> None:
+    # Write helpers must not commit on their own; a failure inside db.transaction() has to
+    # discard every row written so far.
+    path = str(tmp_path / "rollback.db")
+    conn = db.connect(path)
+    try:
+        db.init_db(conn)
+        with pytest.raises(RuntimeError):
+            with db.transaction(conn):
+                candle = [1_700_000_000_000, 1.0, 1.0, 1.0, 1.0, 1.0]
+                db.insert_candles(conn, "BTC/JPY", "1m", [candle], source="test")
+                db.insert_external_trades_many(
+                    conn,
+                    [("ex:1", "ex", "1", "BTC/JPY", "buy", 100.0, 1.0, 100.0, 0.0, "JPY",
+                      "2024-01-01T00:00:00+00:00", "{}")],
+                )
+                db.insert_external_balances_many(
+                    conn, [("ex", "JPY", 10.0, 10.0, 0.0, "2024-01-01T00:00:00+00:00", "{}")]
+                )
+                raise RuntimeError("abort")
+    finally:
+        conn.close()
+
+    reader = sqlite3.connect(path)
+    try:
+        for table in ("candles", "external_trades", "external_balances"):
+            assert reader.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 0
+    finally:
+        reader.close()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from trade_agent.config import RiskConfig, StrategyBaselineConfig, StrategyNewsOverlayConfig
+from trade_agent.news.features import aggregate_sentiment
 from trade_agent.strategies import baseline, news_overlay
 
 
@@ -46,3 +47,23 @@ def test_news_overlay_boosts_size() -> None:
     )
     assert plan.side == "buy"
     assert plan.size > 0
+
+
+def test_news_overlay_from_sentiment_matches_features() -> None:
+    candles = [{"close": v} for v in [100, 101, 102, 103]]
+    base_cfg = StrategyBaselineConfig(sma_period=3, momentum_lookback=2, base_position_pct=0.1)
+    overlay_cfg = StrategyNewsOverlayConfig(
+        sentiment_boost_threshold=0.2,
+        sentiment_cut_threshold=-0.2,
+        boost_multiplier=1.5,
+        cut_multiplier=0.5,
+    )
+    news_features = [{"sentiment": -0.5, "source_weight": 1.0}]
+    from_features = news_overlay.generate_plan(
+        "BTC/JPY", candles, news_features, _risk(), base_cfg, overlay_cfg
+    )
+    from_sentiment = news_overlay.generate_plan_from_sentiment(
+        "BTC/JPY", candles, aggregate_sentiment(news_features), _risk(), base_cfg, overlay_cfg
+    )
+    assert from_sentiment == from_features
+    assert "sentiment cut" in from_sentiment.rationale